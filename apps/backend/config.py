@@ -20,6 +20,9 @@ class Settings(BaseSettings):
     # Embeddings
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384
+    # Vector index built by migration 034: "hnsw" (default) or "ivfflat" (cheaper build and inserts
+    # for write-heavy, query-light corpora; build it once the corpus is loaded, lists come from the row count)
+    vector_index_type: str = "hnsw"
     
     # RAG Reranking Configuration
     # Reranking improves retrieval quality by re-evaluating relevance using a cross-encoder model
@@ -22,7 +22,8 @@ engine = create_engine(
     pool_timeout=30,  # Timeout for getting connection from pool
     connect_args={
         "connect_timeout": 10,  # PostgreSQL connection timeout
-        "options": "-c statement_timeout=30000"  # 30s statement timeout
+        # 30s statement timeout; UTC session so naive datetime.utcnow() values compare correctly with timestamptz columns
+        "options": "-c statement_timeout=30000 -c timezone=UTC"
     },
     echo=False  # Set to True for SQL logging
 )
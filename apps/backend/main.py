@@ -164,6 +164,30 @@ app.include_router(contact_category_router.router)
 app.include_router(conversation_session_router.router)
 
 
+# How often the running backend creates the upcoming monthly action_logs partitions
+_ACTION_LOGS_PARTITIONS_INTERVAL = 24 * 3600
+
+
+def _ensure_action_logs_partitions():
+    """Create the next monthly action_logs partitions (function from migration 028)"""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT ensure_action_logs_partitions()"))
+        return True
+    except Exception as e:
+        # Non-critical: rows outside the existing partitions go to action_logs_default
+        print(f"⚠ Warning: Could not create action_logs partitions: {e}")
+        return False
+
+
+async def _action_logs_partitions_loop():
+    """Keep partitions ahead of time for backends that run longer than the months created at startup"""
+    import asyncio
+    while True:
+        await asyncio.sleep(_ACTION_LOGS_PARTITIONS_INTERVAL)
+        await asyncio.to_thread(_ensure_action_logs_partitions)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -226,6 +250,11 @@ async def startup_event():
         print(f"✗ ERROR: Database connection failed: {e}")
         raise
     
+    # Create the next monthly action_logs partitions now, then daily (kept on app.state so the task isn't collected)
+    if _ensure_action_logs_partitions():
+        print("✓ action_logs partitions ensured")
+    app.state.action_logs_partitions_task = asyncio.create_task(_action_logs_partitions_loop())
+    
     startup_time = time.time() - startup_start
     print(f"✓ Backend started successfully in {startup_time:.2f}s")
 
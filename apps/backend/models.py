@@ -3,23 +3,30 @@ SQLAlchemy models for Minimee
 """
 from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from datetime import datetime
 from db.database import Base
 
 
+# BIGINT ids for high-volume append tables (migration 029); SQLite only auto-increments INTEGER primary keys
+BigIntegerId = sa.BigInteger().with_variant(Integer, "sqlite")
+
+# Short string lists queried with array operators (&&, @>) in PostgreSQL (migration 036); JSON lists on SQLite
+TextArray = ARRAY(Text).with_variant(sa.JSON(), "sqlite")
+
+
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=True)
     password_hash = Column(String, nullable=True)
     avatar_url = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     messages = relationship("Message", back_populates="user")
@@ -39,50 +46,86 @@ class User(Base):
 class Message(Base):
     __tablename__ = "messages"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerId, sa.Identity(), primary_key=True)
     content = Column(Text, nullable=False)
     sender = Column(String, nullable=False)
     recipient = Column(String, nullable=True, index=True)  # For 1-1 conversations
     recipients = Column(JSONB, nullable=True)  # For group conversations (array of participants)
     timestamp = Column(DateTime, nullable=False, index=True)
     source = Column(String, nullable=False)  # 'whatsapp' or 'gmail'
-    conversation_id = Column(String, nullable=True, index=True)
+    conversation_id = Column(String, nullable=True)  # Indexed with timestamp (ix_messages_conv_ts)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="messages")
     embedding = relationship("Embedding", back_populates="message", uselist=False)
+    
+    # Latest messages of a conversation (see migration 031)
+    # and GIN index for recipient containment lookups (PostgreSQL only, see migration 021)
+    __table_args__ = (
+        sa.Index('ix_messages_conv_ts', 'conversation_id', sa.text('timestamp DESC')),
+        sa.Index(
+            'ix_messages_recipients',
+            'recipients',
+            postgresql_using='gin',
+            postgresql_ops={'recipients': 'jsonb_path_ops'}
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class Embedding(Base):
+    # Hash-partitioned by user_id in PostgreSQL (migration 030, primary key (id, user_id), sequence ids)
     __tablename__ = "embeddings"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerId, primary_key=True)
     text = Column(Text, nullable=False)
-    vector = Column(Vector(384), nullable=False)  # pgvector, dimension 384
+    vector = Column(HALFVEC(384), nullable=False)  # pgvector halfvec (16-bit floats), dimension 384
     meta_data = Column("metadata", JSONB, nullable=True)  # Renamed to avoid SQLAlchemy reserved keyword
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=True, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    message_id = Column(sa.BigInteger, ForeignKey("messages.id"), nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Owner (also set for chunks, which have no message)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
 
     # Relationships
     message = relationship("Message", back_populates="embedding")
+    
+    # Expression indexes for semantic search metadata filters (PostgreSQL only, see migration 017)
+    # and HNSW index for the cosine similarity search itself (see migration 018)
+    __table_args__ = (
+        sa.Index(
+            'ix_embeddings_vector_hnsw',
+            'vector',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'vector': 'halfvec_cosine_ops'}
+        ).ddl_if(dialect="postgresql"),
+        sa.Index('ix_embeddings_metadata_conversation_id', sa.text("(metadata->>'conversation_id')")).ddl_if(dialect="postgresql"),
+        sa.Index('ix_embeddings_metadata_thread_id', sa.text("(metadata->>'thread_id')")).ddl_if(dialect="postgresql"),
+        sa.Index('ix_embeddings_metadata_language', sa.text("(metadata->>'language')")).ddl_if(dialect="postgresql"),
+        # Containment filters (metadata @> ...) of filtered semantic search (see migration 032)
+        sa.Index(
+            'ix_embeddings_metadata_gin',
+            'meta_data',
+            postgresql_using='gin',
+            postgresql_ops={'meta_data': 'jsonb_path_ops'}
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class Summary(Base):
     __tablename__ = "summaries"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     conversation_id = Column(String, nullable=False, index=True)
     summary_text = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
 
 class Agent(Base):
     __tablename__ = "agents"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     role = Column(String, nullable=False)
     prompt = Column(Text, nullable=False)
@@ -93,8 +136,18 @@ class Agent(Base):
     whatsapp_integration_id = Column(Integer, ForeignKey("whatsapp_integrations.id"), nullable=True, index=True)
     whatsapp_display_name = Column(String, nullable=True)
     approval_rules = Column(JSONB, nullable=True)  # Rules for automatic approval decisions
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
+
+    __table_args__ = (
+        # Only one Minimee leader per user (PostgreSQL only, see migration 006)
+        sa.Index(
+            'uq_user_minimee_leader',
+            'user_id',
+            unique=True,
+            postgresql_where=sa.text('is_minimee_leader = true')
+        ).ddl_if(dialect="postgresql"),
+    )
 
     # Relationships
     user = relationship("User", back_populates="agents")
@@ -105,12 +158,12 @@ class Agent(Base):
 class Prompt(Base):
     __tablename__ = "prompts"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     content = Column(Text, nullable=False)
     agent_id = Column(Integer, ForeignKey("agents.id"), nullable=True, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     agent = relationship("Agent", back_populates="prompts")
@@ -119,12 +172,12 @@ class Prompt(Base):
 class Policy(Base):
     __tablename__ = "policy"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     rules = Column(JSONB, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="policies")
@@ -133,24 +186,34 @@ class Policy(Base):
 class Log(Base):
     __tablename__ = "logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerId, sa.Identity(), primary_key=True)
     level = Column(String, nullable=False, index=True)  # 'DEBUG', 'INFO', 'WARNING', 'ERROR'
     message = Column(Text, nullable=False)
     meta_data = Column("metadata", JSONB, nullable=True)  # Renamed to avoid SQLAlchemy reserved keyword
     service = Column(String, nullable=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    
+    # Append-only: BRIN instead of BTREE for timestamp ranges (PostgreSQL only, see migration 023)
+    __table_args__ = (
+        sa.Index(
+            'ix_logs_timestamp_brin',
+            'timestamp',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        ).ddl_if(dialect="postgresql"),
+    )
 
 
 class GmailThread(Base):
     __tablename__ = "gmail_threads"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     thread_id = Column(String, unique=True, nullable=False, index=True)
     subject = Column(String, nullable=True)
     participants = Column(JSONB, nullable=True)  # Array of email addresses
     last_message_date = Column(DateTime, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="gmail_threads")
@@ -159,14 +222,14 @@ class GmailThread(Base):
 class OAuthToken(Base):
     __tablename__ = "oauth_tokens"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     provider = Column(String, nullable=False, index=True)  # 'gmail', etc.
     access_token = Column(Text, nullable=False)
     refresh_token = Column(Text, nullable=True)
     expires_at = Column(DateTime, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="oauth_tokens")
@@ -175,46 +238,79 @@ class OAuthToken(Base):
 class Setting(Base):
     __tablename__ = "settings"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     key = Column(String, nullable=False, index=True)
     value = Column(JSONB, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # NULL for global settings
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="settings")
 
 
 class ActionLog(Base):
+    # Partitioned by month on timestamp in PostgreSQL (migration 028, primary key (id, timestamp))
     __tablename__ = "action_logs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigIntegerId, primary_key=True)  # Sequence default: identity is not available on partitioned tables before PostgreSQL 17
     action_type = Column(String, nullable=False, index=True)  # message_arrived, vectorization, semantic_search, etc.
     duration_ms = Column("duration_ms", sa.Float(), nullable=True)  # Temps en millisecondes
     model = Column(String, nullable=True)  # Modèle utilisé
     input_data = Column("input_data", JSONB, nullable=True)  # Données d'entrée
     output_data = Column("output_data", JSONB, nullable=True)  # Données de sortie
     meta_data = Column("metadata", JSONB, nullable=True)  # Renamed to avoid SQLAlchemy reserved keyword
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=True, index=True)
+    message_id = Column(sa.BigInteger, ForeignKey("messages.id"), nullable=True, index=True)
     conversation_id = Column(String, nullable=True, index=True)
-    request_id = Column(String, nullable=True, index=True)  # Pour tracer un flux complet
+    request_id = Column(String, nullable=True)  # Pour tracer un flux complet (indexed by ix_action_logs_request_timestamp)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     source = Column(String, nullable=True)  # 'whatsapp', 'gmail', etc.
     status = Column(String, nullable=True)  # 'success', 'error', 'pending'
     error_message = Column(Text, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     message = relationship("Message", backref="action_logs")
     user_rel = relationship("User", backref="action_logs")
+    
+    # GIN indexes for containment filters on the JSONB payloads (PostgreSQL only, see migration 022)
+    # and BRIN index for timestamp ranges on this append-only table (see migration 023)
+    # Flow traces by request_id are answered from the covering index alone (see migration 026)
+    __table_args__ = (
+        sa.Index(
+            'ix_action_logs_request_timestamp',
+            'request_id',
+            'timestamp',
+            postgresql_include=['action_type', 'duration_ms', 'status']
+        ).ddl_if(dialect="postgresql"),
+        sa.Index(
+            'ix_action_logs_timestamp_brin',
+            'timestamp',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32}
+        ).ddl_if(dialect="postgresql"),
+        # Status values written by action_logger (see migration 033)
+        sa.CheckConstraint("status IN ('success', 'error', 'pending')", name='ck_action_logs_status'),
+    ) + tuple(
+        sa.Index(
+            index_name,
+            column_key,
+            postgresql_using='gin',
+            postgresql_ops={column_key: 'jsonb_path_ops'}
+        ).ddl_if(dialect="postgresql")
+        for index_name, column_key in (
+            ('ix_action_logs_metadata_gin', 'meta_data'),
+            ('ix_action_logs_input_data_gin', 'input_data'),
+            ('ix_action_logs_output_data_gin', 'output_data'),
+        )
+    )
 
 
 class PendingApproval(Base):
     __tablename__ = "pending_approvals"
 
-    id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=True, index=True)  # NULL for email drafts
+    id = Column(Integer, primary_key=True)
+    message_id = Column(sa.BigInteger, ForeignKey("messages.id"), nullable=True, index=True)  # NULL for email drafts
     conversation_id = Column(String, nullable=True)
     sender = Column(String, nullable=False)
     source = Column(String, nullable=False)  # 'whatsapp' or 'gmail'
@@ -236,17 +332,31 @@ class PendingApproval(Base):
     # Relationships
     message = relationship("Message", backref="pending_approvals")
     user = relationship("User", backref="pending_approvals")
+    
+    # Partial index on live approvals only, for the reminder scan (PostgreSQL only, see migration 024)
+    # Status restricted to its documented values (see migration 033)
+    __table_args__ = (
+        sa.Index(
+            'ix_pending_approvals_pending',
+            'created_at',
+            postgresql_where=sa.text("status = 'pending'")
+        ).ddl_if(dialect="postgresql"),
+        sa.CheckConstraint(
+            "status IN ('pending', 'approved', 'rejected', 'expired')",
+            name='ck_pending_approvals_status'
+        ),
+    )
 
 
 class WhatsAppIntegration(Base):
     __tablename__ = "whatsapp_integrations"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads uq_user_integration_type
     integration_type = Column(String, nullable=False, index=True)  # 'user' or 'minimee'
     phone_number = Column(String, nullable=True)
     display_name = Column(String, nullable=True)
-    status = Column(String, nullable=False, default='disconnected', index=True)  # connected/disconnected/pending
+    status = Column(String, nullable=False, default='disconnected')  # connected/disconnected/pending
     auth_info_path = Column(String, nullable=True)  # Path to auth_info directory
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -255,52 +365,73 @@ class WhatsAppIntegration(Base):
     user = relationship("User", back_populates="whatsapp_integrations")
     
     # Unique constraint: one integration per type per user
+    # Partial index on connected integrations only (PostgreSQL only, see migration 024)
+    # Type and status restricted to their documented values (see migration 033)
     __table_args__ = (
         sa.UniqueConstraint('user_id', 'integration_type', name='uq_user_integration_type'),
+        sa.Index(
+            'ix_whatsapp_integrations_connected',
+            'user_id',
+            postgresql_where=sa.text("status = 'connected'")
+        ).ddl_if(dialect="postgresql"),
+        sa.CheckConstraint("integration_type IN ('user', 'minimee')", name='ck_whatsapp_integrations_integration_type'),
+        sa.CheckConstraint(
+            "status IN ('connected', 'disconnected', 'pending')",
+            name='ck_whatsapp_integrations_status'
+        ),
     )
 
 
 class RelationType(Base):
     __tablename__ = "relation_types"
 
-    id = Column(Integer, primary_key=True, index=True)
-    code = Column(String, unique=True, nullable=False, index=True)  # Unique code like 'epoux', 'client'
+    id = Column(Integer, primary_key=True)
+    code = Column(String, unique=True, nullable=False)  # Unique code like 'epoux', 'client'
     label_masculin = Column(String, nullable=False)
     label_feminin = Column(String, nullable=False)
     label_autre = Column(String, nullable=True)  # For "autre" gender
-    category = Column(String, nullable=False, index=True)  # 'personnel' or 'professionnel'
+    category = Column(String, nullable=False)  # 'personnel' or 'professionnel' (leads ix_relation_types_category_order)
     display_order = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, nullable=False, default=True, index=True)
     meta_data = Column("metadata", JSONB, nullable=True)  # For icons, colors, descriptions (renamed to avoid SQLAlchemy reserved word)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     contacts = relationship("Contact", secondary="contact_relation_types", back_populates="relation_types")
+    
+    __table_args__ = (
+        sa.Index('ix_relation_types_category_order', 'category', 'display_order'),
+    )
 
 
 class ContactRelationType(Base):
     __tablename__ = "contact_relation_types"
 
-    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True, index=True)
-    relation_type_id = Column(Integer, ForeignKey("relation_types.id", ondelete="CASCADE"), primary_key=True, index=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True)
+    relation_type_id = Column(Integer, ForeignKey("relation_types.id", ondelete="CASCADE"), primary_key=True)
+    
+    # The primary key serves contact_id lookups; relation_type_id (second key column) needs its own index
+    __table_args__ = (
+        sa.Index('ix_contact_relation_types_type', 'relation_type_id'),
+    )
 
 
 class Contact(Base):
     __tablename__ = "contacts"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads uq_user_conversation_contact
     conversation_id = Column(String, nullable=False, index=True)
     first_name = Column(String, nullable=True)
     nickname = Column(String, nullable=True)
     gender = Column(String, nullable=True)  # masculin, féminin, autre
     # relation_type removed - now using many-to-many relation_types
     context = Column(Text, nullable=True)
-    languages = Column(JSONB, nullable=True)  # Array of languages
+    languages = Column(TextArray, nullable=True)  # Array of languages
     location = Column(String, nullable=True)
     importance_rating = Column(Integer, nullable=True)  # 1-5
-    dominant_themes = Column(JSONB, nullable=True)  # Array of themes
+    dominant_themes = Column(TextArray, nullable=True)  # Array of themes
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -312,15 +443,18 @@ class Contact(Base):
     category = relationship("ContactCategory", back_populates="contacts")
     
     # Unique constraint: one contact per conversation per user
+    # GIN (array_ops) for overlap / containment filters on languages and themes (PostgreSQL only, see migration 036)
     __table_args__ = (
         sa.UniqueConstraint('user_id', 'conversation_id', name='uq_user_conversation_contact'),
+        sa.Index('ix_contacts_languages_gin', 'languages', postgresql_using='gin').ddl_if(dialect="postgresql"),
+        sa.Index('ix_contacts_dominant_themes_gin', 'dominant_themes', postgresql_using='gin').ddl_if(dialect="postgresql"),
     )
 
 
 class IngestionJob(Base):
     __tablename__ = "ingestion_jobs"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     conversation_id = Column(String, nullable=True, index=True)
     status = Column(String, nullable=False, default='pending', index=True)  # pending/running/completed/failed
@@ -336,13 +470,13 @@ class IngestionJob(Base):
 class UserInfo(Base):
     __tablename__ = "user_info"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads uq_user_info_user_type
     info_type = Column(String, nullable=False, index=True)  # first_name, last_name, birth_date, etc.
     info_value = Column(Text, nullable=True)  # For simple text values
     info_value_json = Column(JSONB, nullable=True)  # For complex values (arrays, objects like children)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="user_infos")
@@ -357,16 +491,16 @@ class UserInfo(Base):
 class UserInfoVisibility(Base):
     __tablename__ = "user_info_visibility"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_info_id = Column(Integer, ForeignKey("user_info.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_info_id = Column(Integer, ForeignKey("user_info.id", ondelete="CASCADE"), nullable=False)  # Leads uq_user_info_visibility_composite
     relation_type_id = Column(Integer, ForeignKey("relation_types.id", ondelete="CASCADE"), nullable=True, index=True)  # NULL = global rule
     contact_id = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=True, index=True)  # NULL = rule for category, not specific contact
     can_use_for_response = Column(Boolean, nullable=False, default=False)  # Utilisé pour répondre à
     can_say_explicitly = Column(Boolean, nullable=False, default=False)  # Dit explicitement à
     forbidden_for_response = Column(Boolean, nullable=False, default=False)  # Interdit pour répondre
     forbidden_to_say = Column(Boolean, nullable=False, default=False)  # Interdit de dire explicitement
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user_info = relationship("UserInfo", back_populates="visibilities")
@@ -382,16 +516,16 @@ class UserInfoVisibility(Base):
 class ContactCategory(Base):
     __tablename__ = "contact_categories"
 
-    id = Column(Integer, primary_key=True, index=True)
-    code = Column(String, nullable=False, index=True)  # Unique code like 'famille', 'amis'
+    id = Column(Integer, primary_key=True)
+    code = Column(String, nullable=False)  # Unique code like 'famille', 'amis' (leads uq_contact_categories_code_user)
     label = Column(String, nullable=False)
     category_type = Column(String, nullable=False, index=True)  # 'personnel', 'professionnel', 'autre'
     is_system = Column(Boolean, nullable=False, default=False, index=True)  # System categories vs user-created
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, index=True)  # NULL for system categories
     display_order = Column(Integer, nullable=False, default=0)
     meta_data = Column("metadata", JSONB, nullable=True)  # For icons, colors, descriptions (renamed to avoid SQLAlchemy reserved word)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="contact_categories")
@@ -406,15 +540,19 @@ class ContactCategory(Base):
 class ConversationSession(Base):
     __tablename__ = "conversation_sessions"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # Leads ix_conversation_sessions_user_type
     session_type = Column(String, nullable=False, index=True)  # 'normal', 'getting_to_know'
     title = Column(String, nullable=True)  # User-defined or auto-generated title
     conversation_id = Column(String, nullable=False, index=True)  # Links to messages.conversation_id
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=sa.func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
     deleted_at = Column(DateTime, nullable=True, index=True)  # Soft delete
 
     # Relationships
     user = relationship("User", back_populates="conversation_sessions")
+    
+    __table_args__ = (
+        sa.Index('ix_conversation_sessions_user_type', 'user_id', 'session_type'),
+    )
 
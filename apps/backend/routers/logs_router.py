@@ -283,7 +283,9 @@ async def get_action_logs_endpoint(
         if end_date:
             query = query.filter(ActionLog.timestamp <= end_date)
         
-        query = query.order_by(ActionLog.timestamp.desc())
+        # Rows can be written with an explicit or backfilled timestamp, so id order is not time order;
+        # id only breaks ties. The date filters prune partitions and use the BRIN index.
+        query = query.order_by(ActionLog.timestamp.desc(), ActionLog.id.desc())
         
         logs = query.offset(offset).limit(limit).all()
         
@@ -345,7 +347,7 @@ async def stream_logs(
                 if last_id:
                     query = query.filter(ActionLog.id > last_id)
                 
-                query = query.order_by(ActionLog.timestamp.asc())
+                query = query.order_by(ActionLog.id.asc())
                 logs = query.limit(100).all()
                 
                 if logs:
@@ -1,5 +1,9 @@
 """
 Action Logger Service - Log toutes les actions du système avec timing et détails
+
+Filtres sur input_data / output_data / metadata : utiliser la containment @>
+(ActionLog.meta_data.contains({"search_engine": "pgvector"})) et non -> / ->>,
+seule la containment utilise les index GIN jsonb_path_ops (migration 022)
 """
 import time
 import uuid
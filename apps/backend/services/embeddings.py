@@ -64,6 +64,45 @@ def generate_embedding(text: str, db: Optional[Session] = None, request_id: Opti
     return embedding.tolist()
 
 
+def generate_embeddings(texts: list[str], db: Optional[Session] = None, request_id: Optional[str] = None, user_id: Optional[int] = None) -> list[list[float]]:
+    """
+    Generate embedding vectors for several texts in a single model call
+    Returns one list of floats per text, in input order
+    """
+    if not texts:
+        return []
+    
+    model_instance = get_embedding_model()
+    model_name = settings.embedding_model
+    total_length = sum(len(text) for text in texts)
+    
+    if db:
+        with log_action_context(
+            db=db,
+            action_type="vectorization",
+            model=model_name,
+            input_data={
+                "texts_count": len(texts),
+                "text_length": total_length
+            },
+            request_id=request_id,
+            user_id=user_id,
+            metadata={"embedding_dim": 384, "batch": True}
+        ) as log:
+            embeddings = model_instance.encode(texts, convert_to_numpy=True)
+            log.set_output({
+                "embeddings_count": len(embeddings),
+                "text_length": total_length
+            })
+    else:
+        embeddings = model_instance.encode(texts, convert_to_numpy=True)
+    
+    if db:
+        record_embedding_generation(db, 0, total_length)
+    
+    return [embedding.tolist() for embedding in embeddings]
+
+
 def _calculate_temporal_metadata(timestamp: datetime) -> Dict:
     """
     Calculate temporal metadata from timestamp
@@ -219,6 +258,17 @@ def build_embedding_metadata(
     return metadata
 
 
+def _embedding_owner(user_id: Optional[int], metadata: Optional[dict]) -> Optional[int]:
+    """
+    Owner of a new embedding (embeddings are partitioned by user_id)
+    The explicit user_id, else the user_id recorded in the metadata; None means "the owner of the message"
+    """
+    if user_id is not None:
+        return user_id
+    metadata_user_id = (metadata or {}).get("user_id")
+    return int(metadata_user_id) if metadata_user_id is not None else None
+
+
 def store_embedding(
     db: Session,
     text: str,
@@ -247,35 +297,76 @@ def store_embedding(
     
     vector = generate_embedding(text, db=db, request_id=request_id, user_id=user_id)
     
-    # Convert list to pgvector format string
-    vector_str = "[" + ",".join(map(str, vector)) + "]"
+    # Insert and get the row back in one statement (RETURNING the whole entity, no follow-up SELECT)
+    # null() keeps SQL NULL for empty metadata rather than a JSON 'null' value
+    from sqlalchemy import func, insert, null, select
+    owner_id = _embedding_owner(user_id, metadata)
+    if owner_id is None and message_id is not None:
+        owner_id = select(Message.user_id).where(Message.id == message_id).scalar_subquery()
+    stmt = insert(Embedding).values(
+        text=text,
+        vector=vector,
+        meta_data=metadata if metadata else null(),
+        message_id=message_id,
+        user_id=owner_id,
+        created_at=func.now()
+    ).returning(Embedding)
+    embedding = db.scalars(stmt).one()
     
-    # Serialize metadata to JSONB
-    import json
-    metadata_json = json.dumps(metadata) if metadata else None
+    # Note: Don't commit here - let caller manage transaction
+    # This allows batch operations
+    return embedding
+
+
+def store_embeddings_batch(
+    db: Session,
+    texts: list[str],
+    message_ids: Optional[list[Optional[int]]] = None,
+    metadatas: Optional[list[Optional[dict]]] = None,
+    request_id: Optional[str] = None,
+    user_id: Optional[int] = None
+) -> list[int]:
+    """
+    Generate and store embeddings for several texts at once
+    One model call for all vectors and one multi-row INSERT, instead of one of each per text
+    
+    Args:
+        message_ids: Optional message id per text (same order as texts)
+        metadatas: Optional metadata dict per text (same order as texts)
+    
+    Returns:
+        Created embedding ids, in input order
+    """
+    if not texts:
+        return []
+    
+    message_ids = message_ids or [None] * len(texts)
+    metadatas = metadatas or [None] * len(texts)
+    vectors = generate_embeddings(texts, db=db, request_id=request_id, user_id=user_id)
     
-    # Create embedding record using raw SQL for pgvector
+    import json
     from sqlalchemy import text as sql_text
-    # Use bindparam to properly handle pgvector casting
-    stmt = sql_text("""
-        INSERT INTO embeddings (text, vector, metadata, message_id, created_at)
-        VALUES (:text, CAST(:vector AS vector), CAST(:metadata AS jsonb), :message_id, NOW())
+    values_sql = []
+    params = {}
+    for idx, (text, vector, message_id, metadata) in enumerate(zip(texts, vectors, message_ids, metadatas)):
+        values_sql.append(
+            f"(:text_{idx}, CAST(:vector_{idx} AS halfvec), CAST(:metadata_{idx} AS jsonb), :message_id_{idx}, "
+            f"COALESCE(CAST(:user_id_{idx} AS integer), (SELECT user_id FROM messages WHERE id = :message_id_{idx})), NOW())"
+        )
+        params[f"text_{idx}"] = text
+        params[f"vector_{idx}"] = "[" + ",".join(map(str, vector)) + "]"
+        params[f"metadata_{idx}"] = json.dumps(metadata) if metadata else None
+        params[f"message_id_{idx}"] = message_id
+        params[f"user_id_{idx}"] = _embedding_owner(user_id, metadata)
+    
+    stmt = sql_text(f"""
+        INSERT INTO embeddings (text, vector, metadata, message_id, user_id, created_at)
+        VALUES {", ".join(values_sql)}
         RETURNING id
-    """).bindparams(
-        text=text,
-        vector=vector_str,
-        metadata=metadata_json if metadata_json else None,
-        message_id=message_id
-    )
-    result = db.execute(stmt)
-    embedding_id = result.scalar()
+    """)
     
     # Note: Don't commit here - let caller manage transaction
-    # This allows batch operations
-    
-    # Fetch the created embedding (without commit, use refresh if needed)
-    embedding = db.query(Embedding).filter(Embedding.id == embedding_id).first()
-    return embedding
+    return [row[0] for row in db.execute(stmt, params)]
 
 
 def find_similar_messages(
@@ -296,11 +387,11 @@ def find_similar_messages(
     query = sql_text("""
         SELECT m.id, m.content, m.sender, m.timestamp, m.source, 
                m.conversation_id, m.user_id, m.created_at,
-               1 - (e.vector <=> CAST(:query_vector AS vector)) as similarity
+               1 - (e.vector <=> CAST(:query_vector AS halfvec)) as similarity
         FROM embeddings e
         JOIN messages m ON e.message_id = m.id
-        WHERE 1 - (e.vector <=> CAST(:query_vector AS vector)) >= :threshold
-        ORDER BY e.vector <=> CAST(:query_vector AS vector)
+        WHERE 1 - (e.vector <=> CAST(:query_vector AS halfvec)) >= :threshold
+        ORDER BY e.vector <=> CAST(:query_vector AS halfvec)
         LIMIT :limit
     """)
     
@@ -16,8 +16,17 @@ import threading
 class IngestionJobManager:
     """Manages ingestion jobs with background execution and progress tracking"""
     
-    def __init__(self):
+    def __init__(self, autocommit: bool = True):
         self.running_jobs: Dict[int, threading.Thread] = {}
+        # When False, job updates are only flushed and the caller owns the transaction
+        self.autocommit = autocommit
+    
+    def _commit(self, db: Session):
+        """Commit job changes, or just flush them when the caller owns the transaction"""
+        if self.autocommit:
+            db.commit()
+        else:
+            db.flush()
     
     def create_job(
         self,
@@ -39,7 +48,7 @@ class IngestionJobManager:
             error=None
         )
         db.add(job)
-        db.commit()
+        self._commit(db)
         db.refresh(job)
         
         log_to_db(db, "INFO", f"Created ingestion job {job.id} for user {user_id}", 
@@ -83,7 +92,7 @@ class IngestionJobManager:
         job.progress = progress_data
         job.status = 'running'
         job.updated_at = datetime.utcnow()
-        db.commit()
+        self._commit(db)
         
         # Debug: log if we have logs to broadcast
         if 'thread_log' in extra_data or 'message_log' in extra_data or 'indexing_log' in extra_data:
@@ -156,7 +165,7 @@ class IngestionJobManager:
         job.status = status
         job.error = error
         job.updated_at = datetime.utcnow()
-        db.commit()
+        self._commit(db)
         
         # Broadcast final status (use thread-safe approach)
         progress_data = {
@@ -196,7 +205,7 @@ class IngestionJobManager:
             "status": "cancelled",
             "message": "Job cancelled by user"
         }
-        db.commit()
+        self._commit(db)
         
         # Remove from running jobs (thread will check status and exit)
         if job_id in self.running_jobs:
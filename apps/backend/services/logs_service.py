@@ -141,12 +141,13 @@ def get_logs(
         # Filter by request_id in metadata
         query = query.filter(Log.meta_data['request_id'].astext == request_id)
     
-    # Apply sorting
+    # Apply sorting (id breaks ties so pages are stable for equal values)
     order_field = getattr(Log, order_by, Log.timestamp)
+    order_fields = [order_field] if order_field is Log.id else [order_field, Log.id]
     if order_dir.lower() == "asc":
-        query = query.order_by(asc(order_field))
+        query = query.order_by(*[asc(field) for field in order_fields])
     else:
-        query = query.order_by(desc(order_field))
+        query = query.order_by(*[desc(field) for field in order_fields])
     
     # Get logs with limit first (most important)
     logs = query.offset(offset).limit(limit).all()
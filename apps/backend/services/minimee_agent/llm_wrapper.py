@@ -2,6 +2,7 @@
 LangChain LLM wrapper for Minimee's existing LLM system
 Supports Ollama, vLLM, and OpenAI providers
 """
+from functools import lru_cache
 from typing import Optional, List, Iterator, AsyncIterator
 from langchain_core.language_models.llms import BaseLLM
 from langchain_core.callbacks import CallbackManagerForLLMRun
@@ -24,6 +25,12 @@ class MinimeeLLM(BaseLLM):
     temperature: float = 0.7
     max_tokens: Optional[int] = None
     
+    def with_db(self, db: Optional[Session]) -> "MinimeeLLM":
+        """
+        Return a copy of this LLM bound to another database session
+        """
+        return self.copy(update={"db": db})
+    
     @property
     def _llm_type(self) -> str:
         """Return type of LLM"""
@@ -111,6 +118,24 @@ class MinimeeLLM(BaseLLM):
         )
 
 
+@lru_cache(maxsize=16)
+def _get_base_minimee_llm(
+    user_id: int,
+    model: Optional[str],
+    temperature: float,
+    max_tokens: Optional[int]
+) -> MinimeeLLM:
+    """
+    Session-less MinimeeLLM, built once per configuration and never mutated
+    """
+    return MinimeeLLM(
+        user_id=user_id,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+
+
 def create_minimee_llm(
     db: Session,
     user_id: int,
@@ -121,6 +146,9 @@ def create_minimee_llm(
     """
     Create a MinimeeLLM instance
     
+    The instance for a given configuration is cached and only copied with the
+    caller's session, so each caller gets its own db binding.
+    
     Args:
         db: Database session
         user_id: User ID
@@ -131,12 +159,4 @@ def create_minimee_llm(
     Returns:
         MinimeeLLM instance
     """
-    return MinimeeLLM(
-        db=db,
-        user_id=user_id,
-        model=model,
-        temperature=temperature,
-        max_tokens=max_tokens
-    )
-
-
+    return _get_base_minimee_llm(user_id, model, temperature, max_tokens).with_db(db)
@@ -6,8 +6,9 @@ from typing import Optional, List, Any
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.runnables.config import get_callback_manager_for_config, get_config_list
 from .embeddings_wrapper import MinimeeEmbeddings
-from services.embeddings import generate_embedding
+from services.embeddings import generate_embedding, generate_embeddings
 from sqlalchemy.orm import Session
 from sqlalchemy import text as sql_text
 
@@ -67,6 +68,49 @@ class MinimeeVectorStoreRetriever(BaseRetriever):
         """
         # Generate query embedding
         query_vector = generate_embedding(query, db=self.db)
+        return self._search(query_vector)
+    
+    def batch(
+        self,
+        inputs: List[str],
+        config: Any = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Any
+    ) -> List[Any]:
+        """
+        Retrieve documents for several queries with one embedding call
+        
+        Queries run one after another on self.db: a Session is not thread-safe,
+        so the default thread-pool Runnable.batch cannot be used here.
+        Each query is reported to the callbacks of its config, as with invoke.
+        """
+        configs = get_config_list(config, len(inputs))
+        query_vectors = generate_embeddings(list(inputs), db=self.db)
+        results = []
+        for query, query_vector, query_config in zip(inputs, query_vectors, configs):
+            run_manager = get_callback_manager_for_config(query_config).on_retriever_start(
+                None,
+                query,
+                name=query_config.get("run_name") or self.get_name(),
+                run_id=query_config.pop("run_id", None),
+            )
+            try:
+                documents = self._search(query_vector)
+            except Exception as e:
+                run_manager.on_retriever_error(e)
+                if not return_exceptions:
+                    raise
+                results.append(e)
+            else:
+                run_manager.on_retriever_end(documents)
+                results.append(documents)
+        return results
+    
+    def _search(self, query_vector: List[float]) -> List[Document]:
+        """
+        Run the pgvector similarity query for an already embedded query
+        """
         vector_str = "[" + ",".join(map(str, query_vector)) + "]"
         
         # Build SQL query with filters
@@ -78,7 +122,7 @@ class MinimeeVectorStoreRetriever(BaseRetriever):
                 e.text,
                 e.metadata,
                 e.message_id,
-                1 - (e.vector <=> CAST(:query_vector AS vector)) as similarity,
+                1 - (e.vector <=> CAST(:query_vector AS halfvec)) as similarity,
                 CASE 
                     WHEN e.metadata->>'chunk' = 'true' THEN 1.2  -- Boost chunks by 20%
                     ELSE 1.0
@@ -93,7 +137,7 @@ class MinimeeVectorStoreRetriever(BaseRetriever):
                     ELSE 0.5  -- Default recency weight if no timestamp
                 END as recency_weight
             FROM embeddings e
-            WHERE 1 - (e.vector <=> CAST(:query_vector AS vector)) >= :threshold
+            WHERE 1 - (e.vector <=> CAST(:query_vector AS halfvec)) >= :threshold
         """
         
         params = {
@@ -104,25 +148,9 @@ class MinimeeVectorStoreRetriever(BaseRetriever):
         
         # Add filters
         if self.user_id:
-            # Filter by user_id via message relationship OR metadata OR conversation_id
-            # Chunks don't have message_id but have conversation_id that matches user's conversations
-            query_sql += """
-                AND (
-                    EXISTS (
-                        SELECT 1 FROM messages m
-                        WHERE m.id = e.message_id
-                        AND m.user_id = :user_id
-                    )
-                    OR e.metadata->>'user_id' = :user_id_str
-                    OR EXISTS (
-                        SELECT 1 FROM messages m2
-                        WHERE m2.conversation_id = e.metadata->>'conversation_id'
-                        AND m2.user_id = :user_id
-                    )
-                )
-            """
+            # Embeddings carry their owner (chunks included), and are hash-partitioned by it
+            query_sql += " AND e.user_id = :user_id"
             params["user_id"] = self.user_id
-            params["user_id_str"] = str(self.user_id)
         
         if self.conversation_id:
             query_sql += " AND (e.metadata->>'conversation_id' = :conversation_id OR e.metadata->>'thread_id' = :conversation_id)"
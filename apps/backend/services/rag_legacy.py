@@ -176,19 +176,14 @@ def find_similar_messages_enhanced(
             m.recipient, m.recipients,
             e.id as embedding_id,
             e.text as embedding_text,
-            1 - (e.vector <=> CAST(:query_vector AS vector)) as similarity,
+            1 - (e.vector <=> CAST(:query_vector AS halfvec)) as similarity,
             e.metadata->>'tags' as tags,
             CASE WHEN e.metadata->>'chunk' = 'true' THEN TRUE ELSE FALSE END as is_chunk,
             COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id') as effective_conversation_id,
-            COALESCE(m.user_id, (
-                SELECT DISTINCT msg.user_id 
-                FROM messages msg 
-                WHERE msg.conversation_id = COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id')
-                LIMIT 1
-            )) as effective_user_id
+            e.user_id as effective_user_id
         FROM embeddings e
         LEFT JOIN messages m ON e.message_id = m.id
-        WHERE 1 - (e.vector <=> CAST(:query_vector AS vector)) >= :threshold
+        WHERE 1 - (e.vector <=> CAST(:query_vector AS halfvec)) >= :threshold
     """
     
     # Build params dict
@@ -198,22 +193,13 @@ def find_similar_messages_enhanced(
         "limit": limit
     }
     
-    # Filter by user_id: for messages use m.user_id, for chunks use conversation_id/thread_id from metadata
-    # Note: Chunks without conversation_id/thread_id in metadata (old chunks) won't be filtered by user_id
-    # This is acceptable if all data belongs to the same user or for backward compatibility
+    # Filter by user_id (embeddings carry their owner, chunks included: prunes to one partition)
     if user_id:
-        query_sql += """ AND (
-            m.user_id = :user_id 
-            OR (e.metadata->>'chunk' = 'true' AND EXISTS (
-                SELECT 1 FROM messages msg 
-                WHERE msg.conversation_id = COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id')
-                AND msg.user_id = :user_id
-            ))
-        )"""
+        query_sql += " AND e.user_id = :user_id"
         params["user_id"] = user_id
     
     if language:
-        query_sql += " AND e.metadata->>'language' = :language"
+        query_sql += " AND e.metadata @> jsonb_build_object('language', CAST(:language AS text))"
         params["language"] = language
     
     # Filter by sender (from metadata or message)
@@ -226,8 +212,8 @@ def find_similar_messages_enhanced(
         query_sql += """ AND (
             m.recipient = :recipient 
             OR e.metadata->>'recipient' = :recipient
-            OR :recipient = ANY(SELECT jsonb_array_elements_text(m.recipients))
-            OR :recipient = ANY(SELECT jsonb_array_elements_text(e.metadata->'recipients'))
+            OR m.recipients @> jsonb_build_array(CAST(:recipient AS text))
+            OR e.metadata->'recipients' @> jsonb_build_array(CAST(:recipient AS text))
         )"""
         params["recipient"] = recipient
     
@@ -236,9 +222,9 @@ def find_similar_messages_enhanced(
     
     # Order by chunk priority and similarity
     if use_chunks:
-        query_sql += " ORDER BY is_chunk DESC, e.vector <=> CAST(:query_vector AS vector)"
+        query_sql += " ORDER BY is_chunk DESC, e.vector <=> CAST(:query_vector AS halfvec)"
     else:
-        query_sql += " ORDER BY e.vector <=> CAST(:query_vector AS vector)"
+        query_sql += " ORDER BY e.vector <=> CAST(:query_vector AS halfvec)"
     
     query_sql += " LIMIT :limit"
     
@@ -10,7 +10,7 @@ from services.embeddings import generate_embedding
 from services.logs_service import log_to_db
 from services.metrics import record_rag_hit
 from services.action_logger import log_action_context
-from models import Message, Summary
+from models import Message, Setting, Summary
 from config import settings
 
 # Import LlamaIndex components
@@ -28,6 +28,13 @@ except ImportError:
     TextNode = None
 
 
+# Candidates fetched from the HNSW index per requested result when no selective filter is set
+# (filters and the threshold apply after the index scan, so it oversamples)
+_ANN_OVERSAMPLE = 4
+
+# Candidate list size when rows read from the HNSW index are filtered afterwards, so enough survive the filter
+_FILTERED_EF_SEARCH = 200
+
 # Initialize LlamaIndex settings and reranker (singleton pattern)
 _reranker: Optional[Any] = None
 _llama_settings_initialized = False
@@ -49,6 +56,40 @@ def _initialize_llama_settings():
         log_to_db(None, "WARNING", f"Failed to initialize LlamaIndex settings: {str(e)}", service="rag_llamaindex")
 
 
+def _set_ann_search_params(db: Session, candidate_limit: int, filtered: bool = False):
+    """
+    Tune the vector index scan for this transaction
+    IVFFlat: probe the configured number of lists.
+    HNSW: an index scan returns at most ef_search rows, so it never goes below candidate_limit
+    (nor below _FILTERED_EF_SEARCH when the index rows are filtered afterwards)
+    
+    The index parameters are read on every call (settings 'hnsw_params', see migration 019, and
+    'vector_index', see migration 034), so a rebuilt or switched index is picked up without a restart.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    
+    ann_settings = {
+        setting.key: setting.value
+        for setting in db.query(Setting).filter(
+            Setting.key.in_(["hnsw_params", "vector_index"]),
+            Setting.user_id == None
+        ).all()
+        if isinstance(setting.value, dict)
+    }
+    vector_index = ann_settings.get("vector_index", {})
+    if vector_index.get("type") == "ivfflat":
+        probes = vector_index.get("probes", 10)
+        db.execute(sql_text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+        return
+    
+    ef_search = ann_settings.get("hnsw_params", {}).get("ef_search")
+    ef_search = max(ef_search or 40, candidate_limit)  # 40 = pgvector default
+    if filtered:
+        ef_search = max(ef_search, _FILTERED_EF_SEARCH)
+    db.execute(sql_text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+
+
 def _get_reranker() -> Optional[Any]:
     """Get or create reranker instance (singleton)"""
     global _reranker
@@ -407,19 +448,14 @@ def find_similar_messages_enhanced(
             m.recipient, m.recipients,
             e.id as embedding_id,
             e.text as embedding_text,
-            1 - (e.vector <=> CAST(:query_vector AS vector)) as similarity,
+            1 - (e.vector <=> CAST(:query_vector AS halfvec)) as similarity,
             e.metadata->>'tags' as tags,
             CASE WHEN e.metadata->>'chunk' = 'true' THEN TRUE ELSE FALSE END as is_chunk,
             COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id') as effective_conversation_id,
-            COALESCE(m.user_id, (
-                SELECT DISTINCT msg.user_id 
-                FROM messages msg 
-                WHERE msg.conversation_id = COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id')
-                LIMIT 1
-            )) as effective_user_id
-        FROM embeddings e
+            e.user_id as effective_user_id
+        FROM {embeddings_source} e
         LEFT JOIN messages m ON e.message_id = m.id
-        WHERE 1 - (e.vector <=> CAST(:query_vector AS vector)) >= :threshold
+        WHERE 1 - (e.vector <=> CAST(:query_vector AS halfvec)) >= :threshold
     """
     
     # Build params dict
@@ -429,20 +465,37 @@ def find_similar_messages_enhanced(
         "limit": initial_limit
     }
     
-    # Filter by user_id
+    # Without a selective filter, read nearest neighbours from the vector index (ORDER BY distance LIMIT k, HNSW or IVFFlat)
+    # instead of scoring every embedding. Selective filters keep the exact scan: the matching rows
+    # may not be among the global nearest neighbours. The language filter is written as containment
+    # (metadata @> ...) so the GIN index narrows that scan before distances are computed.
+    # With a user, the index scan stays within that user's partition (embeddings are hash-partitioned by user_id)
+    # Chunks are excluded inside the index scan, otherwise LIMIT could keep only chunks and drop every message
+    if conversation_id or language or sender or recipient:
+        embeddings_source = "embeddings"
+    else:
+        candidate_filters = []
+        if user_id:
+            candidate_filters.append("user_id = :user_id")
+        if not use_chunks:
+            candidate_filters.append("metadata->>'chunk' != 'true'")
+        embeddings_source = """(
+            SELECT * FROM embeddings
+            {candidate_filter}
+            ORDER BY vector <=> CAST(:query_vector AS halfvec)
+            LIMIT :candidate_limit
+        )""".format(candidate_filter="WHERE " + " AND ".join(candidate_filters) if candidate_filters else "")
+        params["candidate_limit"] = initial_limit * _ANN_OVERSAMPLE
+        _set_ann_search_params(db, params["candidate_limit"], filtered=not use_chunks)
+    query_sql = query_sql.format(embeddings_source=embeddings_source)
+    
+    # Filter by user_id (embeddings carry their owner, chunks included: prunes to one partition)
     if user_id:
-        query_sql += """ AND (
-            m.user_id = :user_id 
-            OR (e.metadata->>'chunk' = 'true' AND EXISTS (
-                SELECT 1 FROM messages msg 
-                WHERE msg.conversation_id = COALESCE(m.conversation_id, e.metadata->>'conversation_id', e.metadata->>'thread_id')
-                AND msg.user_id = :user_id
-            ))
-        )"""
+        query_sql += " AND e.user_id = :user_id"
         params["user_id"] = user_id
     
     if language:
-        query_sql += " AND e.metadata->>'language' = :language"
+        query_sql += " AND e.metadata @> jsonb_build_object('language', CAST(:language AS text))"
         params["language"] = language
     
     # Filter by sender
@@ -450,13 +503,13 @@ def find_similar_messages_enhanced(
         query_sql += " AND (e.metadata->>'sender' = :sender OR m.sender = :sender)"
         params["sender"] = sender
     
-    # Filter by recipient
+    # Filter by recipient (1-1 conversations) or participants (groups)
     if recipient:
         query_sql += """ AND (
             m.recipient = :recipient 
             OR e.metadata->>'recipient' = :recipient
-            OR :recipient = ANY(SELECT jsonb_array_elements_text(m.recipients))
-            OR :recipient = ANY(SELECT jsonb_array_elements_text(e.metadata->'recipients'))
+            OR m.recipients @> jsonb_build_array(CAST(:recipient AS text))
+            OR e.metadata->'recipients' @> jsonb_build_array(CAST(:recipient AS text))
         )"""
         params["recipient"] = recipient
     
@@ -464,9 +517,11 @@ def find_similar_messages_enhanced(
         query_sql += " AND e.metadata->>'chunk' != 'true'"
     
     # Filter by conversation_id (prioritize current conversation)
+    # Each branch is indexed on embeddings (message_id, metadata expressions), so PostgreSQL
+    # can combine them with a BitmapOr instead of filtering the joined rows
     if conversation_id:
         query_sql += """ AND (
-            m.conversation_id = :conversation_id 
+            e.message_id IN (SELECT id FROM messages WHERE conversation_id = :conversation_id)
             OR e.metadata->>'conversation_id' = :conversation_id
             OR e.metadata->>'thread_id' = :conversation_id
         )"""
@@ -477,11 +532,11 @@ def find_similar_messages_enhanced(
     if use_chunks:
         query_sql += """ ORDER BY 
             is_chunk DESC, 
-            e.vector <=> CAST(:query_vector AS vector),
+            e.vector <=> CAST(:query_vector AS halfvec),
             COALESCE(m.timestamp, m.created_at, e.created_at) DESC NULLS LAST"""
     else:
         query_sql += """ ORDER BY 
-            e.vector <=> CAST(:query_vector AS vector),
+            e.vector <=> CAST(:query_vector AS halfvec),
             COALESCE(m.timestamp, m.created_at, e.created_at) DESC NULLS LAST"""
     
     query_sql += " LIMIT :limit"
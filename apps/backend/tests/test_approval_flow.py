@@ -21,8 +21,7 @@ def test_generate_response_options(db: Session):
         user_id=1
     )
     db.add(message)
-    db.commit()
-    db.refresh(message)
+    db.flush()
     
     # Generate options (may need to mock LLM calls)
     # For now, test that function doesn't crash
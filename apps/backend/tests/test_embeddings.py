@@ -19,14 +19,16 @@ def test_generate_embedding():
 
 
 @pytest.mark.integration
+@pytest.mark.pgvector
 def test_store_embedding(db: Session):
     """Test storing embedding in database"""
     text = "Test message for embedding storage"
-    embedding = store_embedding(db, text, message_id=None)
+    embedding = store_embedding(db, text, message_id=None, user_id=1)
     
     assert embedding.id is not None
     assert embedding.text == text
     assert embedding.vector is not None
+    assert embedding.user_id == 1
     
     # Verify it can be retrieved
     stored = db.query(Embedding).filter(Embedding.id == embedding.id).first()
@@ -2,24 +2,25 @@
 Tests for Gmail service (mocked)
 """
 import pytest
-from unittest.mock import Mock, patch
 from services.gmail_service import get_oauth_flow, get_user_credentials
 
 
+@pytest.fixture(autouse=True)
+def _gmail_settings(monkeypatch):
+    """Point the Gmail service at test OAuth credentials"""
+    monkeypatch.setattr("services.gmail_service.settings.gmail_client_id", "test_client_id")
+    monkeypatch.setattr("services.gmail_service.settings.gmail_client_secret", "test_secret")
+    monkeypatch.setattr("services.gmail_service.settings.gmail_redirect_uri", "http://localhost:8000/callback")
+
+
 def test_get_oauth_flow():
     """Test OAuth flow creation"""
-    # Mock settings
-    with patch('services.gmail_service.settings') as mock_settings:
-        mock_settings.gmail_client_id = "test_client_id"
-        mock_settings.gmail_client_secret = "test_secret"
-        mock_settings.gmail_redirect_uri = "http://localhost:8000/callback"
-        
-        try:
-            flow = get_oauth_flow()
-            assert flow is not None
-        except ValueError:
-            # Expected if credentials not fully configured
-            pass
+    try:
+        flow = get_oauth_flow()
+        assert flow is not None
+    except ValueError:
+        # Expected if credentials not fully configured
+        pass
 
 
 @pytest.mark.integration
@@ -2,55 +2,99 @@
 Tests for WhatsApp ingestion
 """
 import pytest
+from sqlalchemy import exists, func, select
 from sqlalchemy.orm import Session
 from services.ingestion import ingest_whatsapp_file
 from models import Message, Embedding
 
 
-@pytest.mark.integration
-def test_ingest_whatsapp_file(db: Session):
-    """Test WhatsApp file ingestion"""
-    whatsapp_content = """[01/01/2024, 10:00:00] Alice: Hello, how are you?
+pytestmark = [pytest.mark.integration, pytest.mark.pgvector]
+
+
+WHATSAPP_CONTENT = """[01/01/2024, 10:00:00] Alice: Hello, how are you?
 [01/01/2024, 10:00:15] Bob: I'm doing great! Thanks for asking.
 [01/01/2024, 10:00:30] Alice: That's wonderful to hear.
 [01/01/2024, 10:00:45] Bob: Yes, I'm very excited about the project.
 [01/01/2024, 10:01:00] Alice: Me too! Let's discuss the details.
 [01/01/2024, 10:01:15] Bob: Sounds good. When can we meet?
 """
-    
-    stats = ingest_whatsapp_file(db, whatsapp_content, user_id=1)
-    
-    assert stats['messages_created'] > 0
+
+EMOJI_CONTENT = """[01/01/2024, 10:00:00] User: Hello! 😊🎉
+[01/01/2024, 10:00:15] Friend: Great! 🚀✨
+"""
+
+TOPICS_CONTENT = """[01/01/2024, 10:00:00] Tarik: Je vais au travail
+[01/01/2024, 10:01:00] Hajar: Bonne journée
+[01/01/2024, 10:02:00] Tarik: Merci"""
+
+TEMPORAL_CONTENT = """[01/03/2024, 10:00:00] Tarik: Message de printemps
+[01/03/2024, 10:01:00] Hajar: Réponse"""
+
+
+def _check_messages(db: Session, stats: dict, conversation_id):
+    """Every parsed message is stored, with chunks and summaries"""
     assert stats['chunks_created'] > 0
-    assert stats['embeddings_created'] > 0
     assert stats['summaries_created'] > 0
     
-    # Verify messages were created
-    messages = db.query(Message).filter(
-        Message.source == "whatsapp",
-        Message.user_id == 1
+    count = db.scalar(
+        select(func.count()).select_from(Message).where(
+            Message.source == "whatsapp",
+            Message.user_id == 1
+        )
+    )
+    assert count == stats['messages_created']
+
+
+def _check_emoji(db: Session, stats: dict, conversation_id):
+    """Ingestion preserves emojis"""
+    # At least one message should contain emoji
+    has_emoji = db.scalar(
+        select(exists().where(
+            Message.source == "whatsapp",
+            Message.user_id == 1,
+            Message.content.op("~")("[😊🎉🚀]")
+        ))
+    )
+    assert has_emoji
+
+
+def _check_latent_topic(db: Session, stats: dict, conversation_id):
+    """Blocks are embedded; topic generation may fail if LLM is not available, so only structure is checked"""
+    assert stats['chunks_created'] > 0
+
+
+def _check_period_label(db: Session, stats: dict, conversation_id):
+    """Embeddings include temporal metadata"""
+    embeddings = db.query(Embedding).filter(
+        Embedding.meta_data['conversation_id'].astext == conversation_id
     ).all()
     
-    assert len(messages) == stats['messages_created']
+    assert len(embeddings) > 0
+    for emb in embeddings:
+        if emb.meta_data:
+            assert 'period_label' in emb.meta_data or 'year' in emb.meta_data or 'timestamp' in emb.meta_data
 
 
-@pytest.mark.integration
-def test_ingest_whatsapp_emojis(db: Session):
-    """Test ingestion preserves emojis"""
-    whatsapp_content = """[01/01/2024, 10:00:00] User: Hello! 😊🎉
-[01/01/2024, 10:00:15] Friend: Great! 🚀✨
-"""
-    
-    stats = ingest_whatsapp_file(db, whatsapp_content, user_id=1)
+_FEATURE_CHECKS = {
+    "messages": _check_messages,
+    "emoji": _check_emoji,
+    "latent_topic": _check_latent_topic,
+    "period_label": _check_period_label,
+}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("content,conversation_id,expected_feature", [
+    (WHATSAPP_CONTENT, None, "messages"),
+    (EMOJI_CONTENT, None, "emoji"),
+    (TOPICS_CONTENT, "test_topics", "latent_topic"),
+    (TEMPORAL_CONTENT, "test_temporal", "period_label"),
+])
+def test_ingest_features(db: Session, content: str, conversation_id, expected_feature: str):
+    """Test WhatsApp file ingestion end to end, one feature per case"""
+    stats = ingest_whatsapp_file(db, content, user_id=1, conversation_id=conversation_id)
     
-    # Check messages contain emojis
-    messages = db.query(Message).filter(
-        Message.source == "whatsapp",
-        Message.user_id == 1
-    ).all()
+    assert stats['messages_created'] > 0
+    assert stats['embeddings_created'] > 0
     
-    assert len(messages) > 0
-    # At least one message should contain emoji
-    has_emoji = any("😊" in msg.content or "🎉" in msg.content or "🚀" in msg.content for msg in messages)
-    assert has_emoji
-
+    _FEATURE_CHECKS[expected_feature](db, stats, conversation_id)
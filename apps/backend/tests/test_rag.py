@@ -1,51 +1,122 @@
 """
 Tests for RAG context retrieval
+Retrieval tests run against both backends: the LangChain retriever (create_advanced_retriever)
+and the LlamaIndex pipeline (services.rag_llamaindex.retrieve_context)
 """
 import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from sqlalchemy import event, insert, text
 from sqlalchemy.orm import Session
-from services.rag import retrieve_context, find_similar_messages_enhanced
+from services import embeddings, rag_llamaindex
+from services.rag_llamaindex import retrieve_context
 from services.embeddings import store_embedding
-from models import Message, Embedding
+from services.minimee_agent.vector_store import get_vector_store_retriever
+from models import Message
 
 
-@pytest.mark.integration
-def test_retrieve_context_empty(db: Session):
+pytestmark = pytest.mark.usefixtures("fake_embeddings")
+
+_TS = datetime(2024, 1, 1, 10, 0, 0)
+
+BACKENDS = ["langchain", "llamaindex"]
+
+
+def _retrieve(backend, db, make_retriever, query, limit=2, conversation_id=None, **retriever_options):
+    """
+    Contents retrieved for query by the given backend
+    make_retriever is fast_retriever or retriever_factory; retriever_options only apply to LangChain
+    Without reranking the LangChain candidate set is initial_limit, so it defaults to limit.
+    """
+    if backend == "langchain":
+        retriever_options.setdefault("initial_limit", limit)
+        retriever = make_retriever(final_limit=limit, conversation_id=conversation_id, **retriever_options)
+        return [doc.page_content for doc in retriever.get_relevant_documents(query)]
+    
+    _, details = retrieve_context(
+        db,
+        query,
+        user_id=1,
+        limit=limit,
+        conversation_id=conversation_id,
+        return_details=True
+    )
+    return [result["content"] for result in details["results"]]
+
+
+def _mock_db(rows=()):
+    """Session stub whose similarity query returns rows; writes (action logs, metrics) are swallowed"""
+    db = MagicMock(spec=Session)
+    db.execute.return_value = list(rows)
+    return db
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_context_empty(monkeypatch, backend):
     """Test RAG retrieval with no messages"""
-    context = retrieve_context(db, "test query", user_id=1, limit=5)
-    assert "No relevant conversation history found" in context
+    db = _mock_db()
+    monkeypatch.setattr(rag_llamaindex, "_initialize_llama_settings", lambda: None)
+    monkeypatch.setattr(rag_llamaindex, "find_similar_messages_enhanced", lambda *args, **kwargs: [])
+    
+    def make_retriever(initial_limit, conversation_id=None, **options):
+        return get_vector_store_retriever(db=db, user_id=1, conversation_id=conversation_id, limit=initial_limit)
+    
+    assert _retrieve(backend, db, make_retriever, "test query", limit=1) == []
+
+
+@pytest.mark.unit
+def test_vector_store_retriever_builds_documents():
+    """Test similarity rows are turned into Documents carrying their scores"""
+    db = _mock_db([
+        SimpleNamespace(
+            id=1,
+            text="Test message about AI",
+            metadata={"chunk": "false"},
+            message_id=7,
+            similarity=0.9,
+            chunk_boost=1.0,
+            recency_weight=0.5
+        )
+    ])
+    retriever = get_vector_store_retriever(db=db, user_id=1, limit=1)
+    
+    docs = retriever.get_relevant_documents("AI")
+    
+    assert [doc.page_content for doc in docs] == ["Test message about AI"]
+    metadata = docs[0].metadata
+    assert metadata["embedding_id"] == 1
+    assert metadata["message_id"] == 7
+    assert metadata["similarity"] == 0.9
+    assert metadata["combined_score"] == pytest.approx(0.45)
+    assert db.execute.call_args.args[1]["limit"] == 1
 
 
 @pytest.mark.integration
-def test_retrieve_context_with_messages(db: Session):
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_context_with_messages(seeded_db: Session, fast_retriever, backend):
     """Test RAG retrieval with existing messages"""
-    # Create a test message
-    message = Message(
-        content="This is a test message about artificial intelligence",
-        sender="test_user",
-        timestamp="2024-01-01 10:00:00",
-        source="whatsapp",
-        conversation_id="test_conv",
-        user_id=1
-    )
-    db.add(message)
-    db.commit()
-    db.refresh(message)
-    
-    # Store embedding
-    store_embedding(db, message.content, message_id=message.id)
-    db.commit()
+    found_content = " ".join(_retrieve(backend, seeded_db, fast_retriever, "artificial intelligence"))
     
-    # Retrieve context
-    context = retrieve_context(db, "artificial intelligence", user_id=1, limit=5)
+    assert "test message" in found_content.lower() or "artificial intelligence" in found_content.lower()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+def test_retrieve_context_formats_history(seeded_db: Session):
+    """Test retrieve_context formats results as a prompt-ready history"""
+    context = retrieve_context(seeded_db, "artificial intelligence", user_id=1, limit=2)
     
     assert "Relevant conversation history" in context
     assert "test message" in context.lower()
 
 
 @pytest.mark.integration
+@pytest.mark.pgvector
 def test_find_similar_messages_enhanced(db: Session):
-    """Test enhanced similarity search"""
-    from datetime import datetime
+    """Test enhanced similarity search over stored embeddings (fake embedding model, real pgvector query)"""
     # Create test messages
     messages_data = [
         ("I love machine learning", "user1"),
@@ -53,29 +124,26 @@ def test_find_similar_messages_enhanced(db: Session):
         ("The weather is nice today", "user3"),
     ]
     
-    created_messages = []
-    for content, sender in messages_data:
-        msg = Message(
-            content=content,
-            sender=sender,
-            timestamp=datetime(2024, 1, 1, 10, 0, 0),
-            source="whatsapp",
-            conversation_id="test_conv",
-            user_id=1
-        )
-        db.add(msg)
-        db.commit()
-        db.refresh(msg)
-        store_embedding(db, content, message_id=msg.id)
-        created_messages.append(msg)
-    
-    db.commit()
+    rows = [
+        {
+            "content": content,
+            "sender": sender,
+            "timestamp": _TS,
+            "source": "whatsapp",
+            "conversation_id": "test_conv",
+            "user_id": 1
+        }
+        for content, sender in messages_data
+    ]
+    msg_ids = db.execute(insert(Message).returning(Message.id, sort_by_parameter_order=True), rows).scalars().all()
+    embeddings.store_embeddings_batch(db, [row["content"] for row in rows], message_ids=msg_ids)
     
     # Search for similar messages
-    results = find_similar_messages_enhanced(
+    results = rag_llamaindex.find_similar_messages_enhanced(
         db,
         "machine learning algorithms",
-        limit=5,
+        limit=2,
+        threshold=0.3,
         user_id=1
     )
     
@@ -84,3 +152,303 @@ def test_find_similar_messages_enhanced(db: Session):
     found_content = " ".join([r['message'].content for r in results if r['message']])
     assert "machine learning" in found_content.lower()
 
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+def test_find_similar_messages_enhanced_recipient_filter(db: Session):
+    """Test the recipient filter matches group participants (recipients containment)"""
+    rows = [
+        {
+            "content": f"Dinner plans for the group {name}",
+            "sender": "user1",
+            "recipients": [name, "carol"],
+            "timestamp": _TS,
+            "source": "whatsapp",
+            "conversation_id": f"group_{name}",
+            "user_id": 1
+        }
+        for name in ("alice", "bob")
+    ]
+    msg_ids = db.execute(insert(Message).returning(Message.id, sort_by_parameter_order=True), rows).scalars().all()
+    embeddings.store_embeddings_batch(db, [row["content"] for row in rows], message_ids=msg_ids)
+    
+    results = rag_llamaindex.find_similar_messages_enhanced(
+        db,
+        "dinner plans",
+        limit=5,
+        threshold=0.0,
+        user_id=1,
+        recipient="alice"
+    )
+    
+    assert [r['message'].conversation_id for r in results] == ["group_alice"]
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+def test_find_similar_messages_enhanced_excludes_chunks_before_ann_limit(db: Session):
+    """Test use_chunks=False still finds a message when more chunks than the ANN candidates are closer"""
+    msg_id = db.execute(
+        insert(Message).returning(Message.id),
+        {
+            "content": "Notes from the quarterly budget review meeting",
+            "sender": "user1",
+            "timestamp": _TS,
+            "source": "whatsapp",
+            "conversation_id": "budget_conv",
+            "user_id": 1
+        }
+    ).scalar_one()
+    embeddings.store_embeddings_batch(
+        db,
+        ["Notes from the quarterly budget review meeting"],
+        message_ids=[msg_id],
+        metadatas=[{"chunk": "false"}]
+    )
+    
+    # Identical to the query, so every chunk ranks above the message
+    limit = 2
+    chunk_count = max(limit, rag_llamaindex.settings.rag_rerank_top_k) * rag_llamaindex._ANN_OVERSAMPLE + 1
+    embeddings.store_embeddings_batch(
+        db,
+        ["quarterly budget review"] * chunk_count,
+        metadatas=[{"chunk": "true", "conversation_id": "budget_conv"}] * chunk_count,
+        user_id=1
+    )
+    
+    results = rag_llamaindex.find_similar_messages_enhanced(
+        db,
+        "quarterly budget review",
+        limit=limit,
+        threshold=0.0,
+        user_id=1,
+        use_chunks=False
+    )
+    
+    assert [r['message'].id for r in results if r['message']] == [msg_id]
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+def test_find_similar_messages_enhanced_uses_ann_index(db: Session):
+    """Test the unfiltered similarity search can be served by the HNSW index"""
+    statements = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "<=>" in statement:
+            statements.append((statement, parameters))
+    
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        rag_llamaindex.find_similar_messages_enhanced(db, "machine learning", limit=5, user_id=1)
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    
+    # The test tables are tiny, so make the planner show whether the index is usable at all
+    statement, parameters = statements[0]
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    plan = "\n".join(row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters))
+    
+    assert "ix_embeddings_vector_hnsw" in plan
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_similar_messages(seeded_db: Session, fast_retriever, backend):
+    """Test similarity search over the seeded corpus"""
+    found_content = " ".join(_retrieve(backend, seeded_db, fast_retriever, "machine learning algorithms"))
+    
+    assert "machine learning" in found_content.lower()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.retriever_opts(initial_limit=1, final_limit=1, use_reranking=False, use_history_aware=False)
+def test_retriever_returns_documents(seeded_db: Session, advanced_retriever):
+    """Test LangChain retriever returns Document objects with similarity metadata"""
+    docs = advanced_retriever.get_relevant_documents("AI")
+    
+    assert isinstance(docs, list)
+    assert len(docs) > 0
+    # Check Document structure
+    for doc in docs:
+        assert hasattr(doc, 'page_content')
+        assert isinstance(doc.metadata, dict)
+        # Check similarity in metadata if available
+        if 'similarity' in doc.metadata:
+            assert isinstance(doc.metadata['similarity'], float)
+            assert doc.metadata['similarity'] >= 0.0
+            assert doc.metadata['similarity'] <= 1.0
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+def test_retrieve_context_return_details(seeded_db: Session):
+    """Test retrieve_context returns per-result details"""
+    context, details = retrieve_context(seeded_db, "AI", user_id=1, limit=1, return_details=True)
+    
+    assert details["results_count"] > 0
+    for result in details["results"]:
+        assert {"content", "sender", "timestamp", "similarity", "from_rag"} <= result.keys()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.retriever_opts(initial_limit=2, final_limit=2, use_reranking=False, use_history_aware=False)
+def test_retrieve_context_batch(seeded_db: Session, advanced_retriever, monkeypatch):
+    """Test several queries answered with one batched embedding call"""
+    from services.minimee_agent import vector_store
+    
+    calls = []
+    generate_embeddings = vector_store.generate_embeddings
+    
+    def counting_generate_embeddings(texts, **kwargs):
+        calls.append(texts)
+        return generate_embeddings(texts, **kwargs)
+    
+    monkeypatch.setattr(vector_store, "generate_embeddings", counting_generate_embeddings)
+    
+    ai_docs, ml_docs = advanced_retriever.batch(["artificial intelligence", "machine learning"])
+    
+    assert calls == [["artificial intelligence", "machine learning"]]
+    assert "artificial intelligence" in " ".join(doc.page_content for doc in ai_docs).lower()
+    assert "machine learning" in " ".join(doc.page_content for doc in ml_docs).lower()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.retriever_opts(initial_limit=2, final_limit=2, use_reranking=False, use_history_aware=False)
+def test_retrieve_context_batch_callbacks(seeded_db: Session, advanced_retriever):
+    """Test batched queries are reported to callbacks like invoke"""
+    from langchain_core.callbacks import BaseCallbackHandler
+    
+    class RecordingHandler(BaseCallbackHandler):
+        def __init__(self):
+            self.queries = []
+            self.ended = 0
+        
+        def on_retriever_start(self, serialized, query, **kwargs):
+            self.queries.append(query)
+        
+        def on_retriever_end(self, documents, **kwargs):
+            self.ended += 1
+    
+    handler = RecordingHandler()
+    advanced_retriever.batch(["artificial intelligence", "machine learning"], config={"callbacks": [handler]})
+    
+    assert handler.queries == ["artificial intelligence", "machine learning"]
+    assert handler.ended == 2
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_context_with_filters(seeded_db: Session, fast_retriever, backend):
+    """Test RAG retrieval with conversation filter"""
+    found_content = " ".join(
+        _retrieve(backend, seeded_db, fast_retriever, "programming language", conversation_id="conv_alice")
+    )
+    
+    # Should find alice's message only
+    assert "python" in found_content.lower()
+    assert "javascript" not in found_content.lower()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_context_reranking_enabled(seeded_db: Session, retriever_factory, backend):
+    """Test RAG retrieval with reranking is limited to the final limit (SEED_CORPUS["reranking"])"""
+    contents = _retrieve(
+        backend, seeded_db, retriever_factory, "artificial intelligence",
+        limit=10, initial_limit=15, use_reranking=True, use_history_aware=False
+    )
+    
+    assert len(contents) > 0
+    assert len(contents) <= 10  # Should be limited by final_limit
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.live_embed
+def test_find_similar_messages_with_language_filter(db: Session, fast_retriever):
+    """Test similarity search (language filtering handled by metadata in embeddings)"""
+    # "salut" shares no token with the message: this needs the real model
+    msg1 = Message(
+        content="Bonjour, comment allez-vous?",
+        sender="user1",
+        timestamp=_TS,
+        source="whatsapp",
+        conversation_id="test_conv",
+        user_id=1
+    )
+    
+    db.add(msg1)
+    db.flush()
+    
+    # Store embedding with language metadata
+    store_embedding(
+        db,
+        msg1.content,
+        message_id=msg1.id,
+        user_id=1,
+        metadata={"language": "fr", "chunk": "false"}
+    )
+    
+    # LangChain retriever only: its 0.15 threshold is meant for cross-lingual matches like this one
+    found_content = " ".join(_retrieve("langchain", db, fast_retriever, "salut"))
+    
+    # Should find the French message (semantic similarity)
+    assert "bonjour" in found_content.lower() or "comment" in found_content.lower()
+
+
+@pytest.mark.unit
+def test_build_prompt_with_context():
+    """Test prompt building with context (simplified - LangChain handles this in agents)"""
+    # This test is less relevant now as LangChain agents handle prompt building internally
+    # But we can test that we can format context for prompts
+    context = "Relevant conversation history:\n[2024-01-01 10:00] Alice: Hello there"
+    user_style = "Formal and professional"
+    user_message = "How are you?"
+    
+    # Simple prompt building (LangChain agents do more sophisticated prompt building)
+    prompt = f"""Context: {context}
+User style: {user_style}
+Current message to respond to: {user_message}"""
+
+    assert context in prompt
+    assert user_style in prompt
+    assert user_message in prompt
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_find_similar_messages_use_chunks(seeded_db: Session, fast_retriever, backend):
+    """Test similarity search returns chunk embeddings alongside messages"""
+    found_content = " ".join(_retrieve(backend, seeded_db, fast_retriever, "AI"))
+    
+    assert "chunk content about ai" in found_content.lower()
+
+
+@pytest.mark.integration
+@pytest.mark.pgvector
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_retrieve_context_includes_recent_messages(seeded_db: Session, retriever_factory, backend):
+    """Test that recent messages of the conversation are part of the retrieved context (SEED_CORPUS["recent_context"])"""
+    conversation_id = "test_recent_context"
+    
+    # Retrieve context for the last message with conversation_id
+    # History-aware on purpose: the only test that builds that retriever
+    found_content = " ".join(
+        _retrieve(
+            backend, seeded_db, retriever_factory, "cerise moi l invitation", conversation_id=conversation_id,
+            use_history_aware=True, use_reranking=False
+        )
+    )
+    
+    # Should include recent messages (msg3 should be included even if similarity is low)
+    # The numbered answer about the event details should be in context (not just the query itself)
+    assert "27 juillet" in found_content or "Lascaux" in found_content or "escalade" in found_content
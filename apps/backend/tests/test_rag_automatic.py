@@ -3,25 +3,59 @@ Tests for automatic RAG chain with context injection
 Tests the rag_chain module and its integration with MinimeeAgent
 """
 import pytest
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from services.minimee_agent.rag_chain import create_rag_chain, get_rag_metrics, reset_rag_metrics
 from services.minimee_agent.retriever import create_advanced_retriever
-from services.minimee_agent.llm_wrapper import create_minimee_llm
-from services.minimee_agent.prompts import create_agent_prompt
-from services.embeddings import store_embedding
+from services.embeddings import store_embedding, store_embeddings_batch
 from models import Message
-from types import SimpleNamespace
+from langchain_core.prompts import ChatPromptTemplate
 
 
-@pytest.mark.integration
-def test_rag_chain_retrieves_context(db: Session):
+pytestmark = [pytest.mark.integration, pytest.mark.pgvector, pytest.mark.usefixtures("fake_embeddings")]
+
+# Fixed timestamps keep ordering-by-recency deterministic across runs
+_BASE_TS = datetime(2024, 1, 1, 10, 0, 0)
+_TIMESTAMPS = [_BASE_TS - timedelta(minutes=i) for i in range(20)]
+
+_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", "You are a helpful assistant."),
+    ("human", "Context: {context}\n\nQuestion: {input}")
+])
+
+
+@pytest.fixture
+def rag_chain_factory(db: Session, fake_llm):
+    """Build a RAG chain over the test database, varying only the retriever/chain knobs"""
+    def _make(max_chunks: int = 10, **retriever_kwargs):
+        retriever = create_advanced_retriever(
+            llm=fake_llm,
+            db=db,
+            user_id=1,
+            use_history_aware=False,
+            use_reranking=False,
+            **retriever_kwargs
+        )
+        return create_rag_chain(
+            retriever=retriever,
+            llm=fake_llm,
+            prompt_template=_PROMPT_TEMPLATE,
+            db=db,
+            user_id=1,
+            max_chunks=max_chunks,
+            timeout_seconds=5.0
+        )
+    return _make
+
+
+def test_rag_chain_retrieves_context(db: Session, rag_chain_factory):
     """Test that RAG chain retrieves relevant context"""
     # Create test messages
     msg1 = Message(
         content="I love machine learning and artificial intelligence",
         sender="user1",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
@@ -29,7 +63,7 @@ def test_rag_chain_retrieves_context(db: Session):
     msg2 = Message(
         content="The weather is nice today",
         sender="user2",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
@@ -37,41 +71,13 @@ def test_rag_chain_retrieves_context(db: Session):
     
     db.add(msg1)
     db.add(msg2)
-    db.commit()
-    db.refresh(msg1)
-    db.refresh(msg2)
+    db.flush()
     
     # Store embeddings
     store_embedding(db, msg1.content, message_id=msg1.id, user_id=1)
     store_embedding(db, msg2.content, message_id=msg2.id, user_id=1)
-    db.commit()
-    
-    # Create RAG chain
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        use_history_aware=False,
-        use_reranking=False
-    )
     
-    # Create a simple prompt template for testing
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=10,
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory()
     
     # Invoke RAG chain
     result = rag_chain.invoke({"input": "machine learning"})
@@ -83,14 +89,13 @@ def test_rag_chain_retrieves_context(db: Session):
     assert result["chunks_retrieved"] > 0
 
 
-@pytest.mark.integration
-def test_rag_chain_source_filtering(db: Session):
+def test_rag_chain_source_filtering(db: Session, rag_chain_factory):
     """Test that RAG chain respects included_sources filter"""
     # Create messages from different sources
     msg_whatsapp = Message(
         content="WhatsApp message about Python",
         sender="user1",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
@@ -98,7 +103,7 @@ def test_rag_chain_source_filtering(db: Session):
     msg_gmail = Message(
         content="Gmail message about JavaScript",
         sender="user2",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="gmail",
         conversation_id="test_conv",
         user_id=1
@@ -106,41 +111,13 @@ def test_rag_chain_source_filtering(db: Session):
     
     db.add(msg_whatsapp)
     db.add(msg_gmail)
-    db.commit()
-    db.refresh(msg_whatsapp)
-    db.refresh(msg_gmail)
+    db.flush()
     
     # Store embeddings
     store_embedding(db, msg_whatsapp.content, message_id=msg_whatsapp.id, user_id=1)
     store_embedding(db, msg_gmail.content, message_id=msg_gmail.id, user_id=1)
-    db.commit()
     
-    # Create RAG chain with WhatsApp only
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        included_sources=["whatsapp"],
-        use_history_aware=False,
-        use_reranking=False
-    )
-    
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=10,
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory(included_sources=["whatsapp"])
     
     # Invoke RAG chain
     result = rag_chain.invoke({"input": "programming"})
@@ -152,8 +129,7 @@ def test_rag_chain_source_filtering(db: Session):
         assert "javascript" not in result["context"].lower()
 
 
-@pytest.mark.integration
-def test_rag_chain_metrics(db: Session):
+def test_rag_chain_metrics(db: Session, rag_chain_factory):
     """Test that RAG chain tracks metrics correctly"""
     reset_rag_metrics()
     
@@ -161,43 +137,17 @@ def test_rag_chain_metrics(db: Session):
     msg = Message(
         content="Test message for metrics",
         sender="user1",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
     
     store_embedding(db, msg.content, message_id=msg.id, user_id=1)
-    db.commit()
-    
-    # Create RAG chain
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        use_history_aware=False,
-        use_reranking=False
-    )
-    
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
     
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=10,
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory()
     
     # Invoke multiple times
     for _ in range(3):
@@ -211,11 +161,10 @@ def test_rag_chain_metrics(db: Session):
     assert metrics["avg_chunks_per_call"] >= 0
 
 
-@pytest.mark.integration
-def test_rag_chain_fallback_on_error(db: Session):
+def test_rag_chain_fallback_on_error(db: Session, fake_llm):
     """Test that RAG chain falls back gracefully on errors"""
     # Create RAG chain with invalid retriever (will cause error)
-    llm = create_minimee_llm(db=db, user_id=1)
+    llm = fake_llm
     
     # Create a retriever that will fail
     from services.minimee_agent.vector_store import get_vector_store_retriever
@@ -225,16 +174,10 @@ def test_rag_chain_fallback_on_error(db: Session):
         limit=10
     )
     
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
     rag_chain = create_rag_chain(
         retriever=retriever,
         llm=llm,
-        prompt_template=prompt_template,
+        prompt_template=_PROMPT_TEMPLATE,
         db=db,
         user_id=1,
         max_chunks=10,
@@ -249,51 +192,25 @@ def test_rag_chain_fallback_on_error(db: Session):
     assert result["chunks_retrieved"] == 0
 
 
-@pytest.mark.integration
-def test_rag_chain_max_chunks_limit(db: Session):
+@pytest.mark.slow
+def test_rag_chain_max_chunks_limit(db: Session, rag_chain_factory):
     """Test that RAG chain respects max_chunks limit"""
-    # Create many test messages
-    for i in range(20):
-        msg = Message(
-            content=f"Test message {i} about artificial intelligence",
-            sender=f"user{i}",
-            timestamp=datetime.utcnow() - timedelta(minutes=i),
-            source="whatsapp",
-            conversation_id="test_conv",
-            user_id=1
-        )
-        db.add(msg)
-        db.commit()
-        db.refresh(msg)
-        store_embedding(db, msg.content, message_id=msg.id, user_id=1)
-    
-    db.commit()
-    
-    # Create RAG chain with max_chunks=5
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        use_history_aware=False,
-        use_reranking=False
-    )
+    # Create many test messages in one INSERT, then embed them in one batch
+    rows = [
+        {
+            "content": f"Test message {i} about artificial intelligence",
+            "sender": f"user{i}",
+            "timestamp": _TIMESTAMPS[i],
+            "source": "whatsapp",
+            "conversation_id": "test_conv",
+            "user_id": 1
+        }
+        for i in range(20)
+    ]
+    msg_ids = db.execute(insert(Message).returning(Message.id, sort_by_parameter_order=True), rows).scalars().all()
+    store_embeddings_batch(db, [row["content"] for row in rows], message_ids=msg_ids, user_id=1)
     
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=5,  # Limit to 5 chunks
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory(max_chunks=5)
     
     # Invoke RAG chain
     result = rag_chain.invoke({"input": "artificial intelligence"})
@@ -302,21 +219,19 @@ def test_rag_chain_max_chunks_limit(db: Session):
     assert result["chunks_retrieved"] <= 5
 
 
-@pytest.mark.integration
-def test_rag_chain_chunk_prioritization(db: Session):
+def test_rag_chain_chunk_prioritization(db: Session, rag_chain_factory):
     """Test that RAG chain prioritizes chunks over individual messages"""
     # Create individual message
     msg = Message(
         content="Individual message about AI",
         sender="user1",
-        timestamp=datetime.utcnow(),
+        timestamp=_BASE_TS,
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
     )
     db.add(msg)
-    db.commit()
-    db.refresh(msg)
+    db.flush()
     
     # Store individual message embedding
     store_embedding(
@@ -342,33 +257,7 @@ def test_rag_chain_chunk_prioritization(db: Session):
         }
     )
     
-    db.commit()
-    
-    # Create RAG chain
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        use_history_aware=False,
-        use_reranking=False
-    )
-    
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=10,
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory()
     
     # Invoke RAG chain
     result = rag_chain.invoke({"input": "artificial intelligence"})
@@ -379,14 +268,13 @@ def test_rag_chain_chunk_prioritization(db: Session):
         assert "artificial intelligence" in result["context"].lower() or "machine learning" in result["context"].lower()
 
 
-@pytest.mark.integration
-def test_rag_chain_recency_weighting(db: Session):
+def test_rag_chain_recency_weighting(db: Session, rag_chain_factory):
     """Test that RAG chain weights recent messages higher"""
     # Create old message
     old_msg = Message(
         content="Old message about Python",
         sender="user1",
-        timestamp=datetime.utcnow() - timedelta(days=60),  # 60 days ago
+        timestamp=_BASE_TS - timedelta(days=60),  # 60 days earlier
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
@@ -396,7 +284,7 @@ def test_rag_chain_recency_weighting(db: Session):
     recent_msg = Message(
         content="Recent message about Python",
         sender="user1",
-        timestamp=datetime.utcnow() - timedelta(hours=1),  # 1 hour ago
+        timestamp=_BASE_TS - timedelta(hours=1),  # 1 hour earlier
         source="whatsapp",
         conversation_id="test_conv",
         user_id=1
@@ -404,40 +292,13 @@ def test_rag_chain_recency_weighting(db: Session):
     
     db.add(old_msg)
     db.add(recent_msg)
-    db.commit()
-    db.refresh(old_msg)
-    db.refresh(recent_msg)
+    db.flush()
     
     # Store embeddings
     store_embedding(db, old_msg.content, message_id=old_msg.id, user_id=1)
     store_embedding(db, recent_msg.content, message_id=recent_msg.id, user_id=1)
-    db.commit()
-    
-    # Create RAG chain
-    llm = create_minimee_llm(db=db, user_id=1)
-    retriever = create_advanced_retriever(
-        llm=llm,
-        db=db,
-        user_id=1,
-        use_history_aware=False,
-        use_reranking=False
-    )
     
-    from langchain_core.prompts import ChatPromptTemplate
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", "You are a helpful assistant."),
-        ("human", "Context: {context}\n\nQuestion: {input}")
-    ])
-    
-    rag_chain = create_rag_chain(
-        retriever=retriever,
-        llm=llm,
-        prompt_template=prompt_template,
-        db=db,
-        user_id=1,
-        max_chunks=10,
-        timeout_seconds=5.0
-    )
+    rag_chain = rag_chain_factory()
     
     # Invoke RAG chain
     result = rag_chain.invoke({"input": "Python"})
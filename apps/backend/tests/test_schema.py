@@ -0,0 +1,36 @@
+"""
+Tests for schema conventions (models and migrations)
+"""
+import re
+from pathlib import Path
+import pytest
+from db.database import Base
+import models  # noqa: F401 - registers the tables on Base.metadata
+
+
+_MIGRATIONS_DIR = Path(__file__).resolve().parents[3] / "infra" / "db" / "migrations" / "versions"
+
+# Migrations up to 025 (which drops them) created ix_<table>_id next to the primary key
+_LAST_MIGRATION_WITH_ID_INDEXES = 25
+
+
+@pytest.mark.unit
+def test_models_do_not_index_primary_keys():
+    """Test no model declares an index duplicating its primary key"""
+    for table in Base.metadata.sorted_tables:
+        primary_key = [column.name for column in table.primary_key.columns]
+        for index in table.indexes:
+            assert [column.name for column in index.columns] != primary_key, f"{index.name} duplicates the primary key of {table.name}"
+
+
+@pytest.mark.unit
+def test_migrations_do_not_index_primary_keys():
+    """Test new migrations do not index id next to the primary key"""
+    if not _MIGRATIONS_DIR.is_dir():
+        pytest.skip("migrations are not available in this checkout")
+    
+    for path in sorted(_MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.py")):
+        if int(path.name[:3]) <= _LAST_MIGRATION_WITH_ID_INDEXES:
+            continue
+        source = path.read_text()
+        assert not re.search(r"create_index\([^)]*\[\s*['\"]id['\"]\s*\]", source), f"{path.name} indexes the primary key"
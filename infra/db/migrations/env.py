@@ -9,6 +9,8 @@ from alembic import context
 
 # Add backend to path so we can import models
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../apps/backend')))
+# Migrations import their shared helpers (migration_utils) from this directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import models to register with Base
 from models import Base
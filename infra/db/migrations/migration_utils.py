@@ -0,0 +1,78 @@
+"""
+Helpers shared by the migrations in versions/
+"""
+from typing import Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def _is_partitioned(relation: str) -> bool:
+    return bool(op.get_bind().execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_class WHERE oid = to_regclass(:name) AND relkind IN ('p', 'I'))"),
+        {"name": relation}
+    ).scalar())
+
+
+def _partitions(table: str) -> list:
+    return list(op.get_bind().execute(
+        sa.text("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:table) ORDER BY 1"),
+        {"table": table}
+    ).scalars())
+
+
+def _drop_if_invalid(name: str) -> None:
+    # A failed CONCURRENTLY build leaves an INVALID index behind: drop it so the next run rebuilds it
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name}
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def create_index_concurrent(name: str, table: str, cols: str, opts: str = "", using: Optional[str] = None) -> None:
+    """
+    CREATE INDEX CONCURRENTLY in an autocommit block, so writers keep going during the build
+    cols is the SQL column list (with op classes / expressions), opts what follows it (INCLUDE, WITH, WHERE)
+    Partitioned tables cannot be indexed concurrently: the parent index is created ON ONLY the table,
+    each partition is indexed concurrently, then attached.
+    Commits the migration transaction so far (as any autocommit block does)
+    """
+    method = f" USING {using}" if using else ""
+    with op.get_context().autocommit_block():
+        if not _is_partitioned(table):
+            _drop_if_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}{method} ({cols}) {opts}")
+            return
+        
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table}{method} ({cols}) {opts}")
+        for partition in _partitions(table):
+            partition_index = f"{name}_{partition}"
+            _drop_if_invalid(partition_index)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition}{method} ({cols}) {opts}")
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def drop_index_concurrent(name: str) -> None:
+    """
+    DROP INDEX CONCURRENTLY in an autocommit block
+    An index on a partitioned table cannot be dropped concurrently and takes the plain DROP INDEX
+    """
+    with op.get_context().autocommit_block():
+        if _is_partitioned(name):
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        else:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def rebuild_index_concurrent(name: str, table: str, cols: str, opts: str = "", using: Optional[str] = None) -> None:
+    """
+    Replace index name with a new definition without leaving the table unindexed:
+    the new index is built concurrently under a temporary name, then swapped in for the old one
+    (plain tables only: renaming a partitioned index would not rename its partition indexes)
+    """
+    rebuild = f"{name}_rebuild"
+    create_index_concurrent(rebuild, table, cols, opts, using)
+    drop_index_concurrent(name)
+    op.execute(f"ALTER INDEX {rebuild} RENAME TO {name}")
@@ -8,14 +8,6 @@ Create Date: 2024-11-02 00:00:00.000000
 from typing import Sequence, Union
 
 from alembic import op
-import sqlalchemy as sa
-from sqlalchemy.dialects import postgresql
-# Import Vector type for pgvector
-try:
-    from pgvector.sqlalchemy import Vector
-except ImportError:
-    # Fallback if pgvector not available during migration generation
-    Vector = None
 
 # revision identifiers, used by Alembic.
 revision: str = '001'
@@ -23,201 +15,184 @@ down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# (table, columns, indexes as (name, column, unique)) in creation order; one DDL script creates them all
+_TABLES = [
+    ('users', [
+        "id SERIAL NOT NULL",
+        "email VARCHAR NOT NULL",
+        "name VARCHAR",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+    ], [
+        ('ix_users_id', 'id', False),
+        ('ix_users_email', 'email', True),
+    ]),
+    ('messages', [
+        "id SERIAL NOT NULL",
+        "content TEXT NOT NULL",
+        "sender VARCHAR NOT NULL",
+        "timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "source VARCHAR NOT NULL",
+        "conversation_id VARCHAR",
+        "user_id INTEGER NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_messages_id', 'id', False),
+        ('ix_messages_user_id', 'user_id', False),
+        ('ix_messages_timestamp', 'timestamp', False),
+        ('ix_messages_conversation_id', 'conversation_id', False),
+    ]),
+    # vector column from pgvector
+    ('embeddings', [
+        "id SERIAL PRIMARY KEY",
+        "text TEXT NOT NULL",
+        "vector vector(384) NOT NULL",
+        "metadata JSONB",
+        "message_id INTEGER REFERENCES messages(id)",
+        "created_at TIMESTAMP NOT NULL",
+    ], [
+        ('ix_embeddings_id', 'id', False),
+        ('ix_embeddings_message_id', 'message_id', False),
+    ]),
+    ('summaries', [
+        "id SERIAL NOT NULL",
+        "conversation_id VARCHAR NOT NULL",
+        "summary_text TEXT NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+    ], [
+        ('ix_summaries_id', 'id', False),
+        ('ix_summaries_conversation_id', 'conversation_id', False),
+    ]),
+    ('agents', [
+        "id SERIAL NOT NULL",
+        "name VARCHAR NOT NULL",
+        "role VARCHAR NOT NULL",
+        "prompt TEXT NOT NULL",
+        "style TEXT",
+        "enabled BOOLEAN NOT NULL",
+        "user_id INTEGER NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_agents_id', 'id', False),
+        ('ix_agents_user_id', 'user_id', False),
+    ]),
+    ('prompts', [
+        "id SERIAL NOT NULL",
+        "name VARCHAR NOT NULL",
+        "content TEXT NOT NULL",
+        "agent_id INTEGER",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(agent_id) REFERENCES agents (id)",
+    ], [
+        ('ix_prompts_id', 'id', False),
+        ('ix_prompts_agent_id', 'agent_id', False),
+    ]),
+    ('policy', [
+        "id SERIAL NOT NULL",
+        "name VARCHAR NOT NULL",
+        "rules JSONB NOT NULL",
+        "user_id INTEGER NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_policy_id', 'id', False),
+        ('ix_policy_user_id', 'user_id', False),
+    ]),
+    ('logs', [
+        "id SERIAL NOT NULL",
+        "level VARCHAR NOT NULL",
+        "message TEXT NOT NULL",
+        "metadata JSONB",
+        "service VARCHAR",
+        "timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+    ], [
+        ('ix_logs_id', 'id', False),
+        ('ix_logs_level', 'level', False),
+        ('ix_logs_service', 'service', False),
+        ('ix_logs_timestamp', 'timestamp', False),
+    ]),
+    ('gmail_threads', [
+        "id SERIAL NOT NULL",
+        "thread_id VARCHAR NOT NULL",
+        "subject VARCHAR",
+        "participants JSONB",
+        "last_message_date TIMESTAMP WITHOUT TIME ZONE",
+        "user_id INTEGER NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_gmail_threads_id', 'id', False),
+        ('ix_gmail_threads_thread_id', 'thread_id', True),
+        ('ix_gmail_threads_user_id', 'user_id', False),
+    ]),
+    ('oauth_tokens', [
+        "id SERIAL NOT NULL",
+        "provider VARCHAR NOT NULL",
+        "access_token TEXT NOT NULL",
+        "refresh_token TEXT",
+        "expires_at TIMESTAMP WITHOUT TIME ZONE",
+        "user_id INTEGER NOT NULL",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_oauth_tokens_id', 'id', False),
+        ('ix_oauth_tokens_provider', 'provider', False),
+        ('ix_oauth_tokens_user_id', 'user_id', False),
+    ]),
+    ('settings', [
+        "id SERIAL NOT NULL",
+        "key VARCHAR NOT NULL",
+        "value JSONB NOT NULL",
+        "user_id INTEGER",
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL",
+        "PRIMARY KEY (id)",
+        "FOREIGN KEY(user_id) REFERENCES users (id)",
+    ], [
+        ('ix_settings_id', 'id', False),
+        ('ix_settings_key', 'key', False),
+        ('ix_settings_user_id', 'user_id', False),
+    ]),
+]
+
+
+def _create_sql() -> str:
+    statements = []
+    for table, columns, indexes in _TABLES:
+        column_sql = ",\n    ".join(columns)
+        statements.append(f"CREATE TABLE {table} (\n    {column_sql}\n);")
+        for name, column, unique in indexes:
+            statements.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({column});")
+    return "\n".join(statements)
+
 
 def upgrade() -> None:
     # Create pgvector extension
     op.execute('CREATE EXTENSION IF NOT EXISTS vector;')
-
-    # Create users table
-    op.create_table(
-        'users',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('email', sa.String(), nullable=False),
-        sa.Column('name', sa.String(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
-    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
-
-    # Create messages table
-    op.create_table(
-        'messages',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('content', sa.Text(), nullable=False),
-        sa.Column('sender', sa.String(), nullable=False),
-        sa.Column('timestamp', sa.DateTime(), nullable=False),
-        sa.Column('source', sa.String(), nullable=False),
-        sa.Column('conversation_id', sa.String(), nullable=True),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_messages_id'), 'messages', ['id'], unique=False)
-    op.create_index(op.f('ix_messages_user_id'), 'messages', ['user_id'], unique=False)
-    op.create_index(op.f('ix_messages_timestamp'), 'messages', ['timestamp'], unique=False)
-    op.create_index(op.f('ix_messages_conversation_id'), 'messages', ['conversation_id'], unique=False)
-
-    # Create embeddings table with pgvector
-    # Use raw SQL for vector column as Alembic doesn't directly support it
-    op.execute("""
-        CREATE TABLE embeddings (
-            id SERIAL PRIMARY KEY,
-            text TEXT NOT NULL,
-            vector vector(384) NOT NULL,
-            metadata JSONB,
-            message_id INTEGER REFERENCES messages(id),
-            created_at TIMESTAMP NOT NULL
-        );
-    """)
-    op.create_index('ix_embeddings_id', 'embeddings', ['id'], unique=False)
-    op.create_index('ix_embeddings_message_id', 'embeddings', ['message_id'], unique=False)
-
-    # Create summaries table
-    op.create_table(
-        'summaries',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('conversation_id', sa.String(), nullable=False),
-        sa.Column('summary_text', sa.Text(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_summaries_id'), 'summaries', ['id'], unique=False)
-    op.create_index(op.f('ix_summaries_conversation_id'), 'summaries', ['conversation_id'], unique=False)
-
-    # Create agents table
-    op.create_table(
-        'agents',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(), nullable=False),
-        sa.Column('role', sa.String(), nullable=False),
-        sa.Column('prompt', sa.Text(), nullable=False),
-        sa.Column('style', sa.Text(), nullable=True),
-        sa.Column('enabled', sa.Boolean(), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_agents_id'), 'agents', ['id'], unique=False)
-    op.create_index(op.f('ix_agents_user_id'), 'agents', ['user_id'], unique=False)
-
-    # Create prompts table
-    op.create_table(
-        'prompts',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(), nullable=False),
-        sa.Column('content', sa.Text(), nullable=False),
-        sa.Column('agent_id', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['agent_id'], ['agents.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_prompts_id'), 'prompts', ['id'], unique=False)
-    op.create_index(op.f('ix_prompts_agent_id'), 'prompts', ['agent_id'], unique=False)
-
-    # Create policy table
-    op.create_table(
-        'policy',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('name', sa.String(), nullable=False),
-        sa.Column('rules', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_policy_id'), 'policy', ['id'], unique=False)
-    op.create_index(op.f('ix_policy_user_id'), 'policy', ['user_id'], unique=False)
-
-    # Create logs table
-    op.create_table(
-        'logs',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('level', sa.String(), nullable=False),
-        sa.Column('message', sa.Text(), nullable=False),
-        sa.Column('metadata', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
-        sa.Column('service', sa.String(), nullable=True),
-        sa.Column('timestamp', sa.DateTime(), nullable=False),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_logs_id'), 'logs', ['id'], unique=False)
-    op.create_index(op.f('ix_logs_level'), 'logs', ['level'], unique=False)
-    op.create_index(op.f('ix_logs_service'), 'logs', ['service'], unique=False)
-    op.create_index(op.f('ix_logs_timestamp'), 'logs', ['timestamp'], unique=False)
-
-    # Create gmail_threads table
-    op.create_table(
-        'gmail_threads',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('thread_id', sa.String(), nullable=False),
-        sa.Column('subject', sa.String(), nullable=True),
-        sa.Column('participants', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
-        sa.Column('last_message_date', sa.DateTime(), nullable=True),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_gmail_threads_id'), 'gmail_threads', ['id'], unique=False)
-    op.create_index(op.f('ix_gmail_threads_thread_id'), 'gmail_threads', ['thread_id'], unique=True)
-    op.create_index(op.f('ix_gmail_threads_user_id'), 'gmail_threads', ['user_id'], unique=False)
-
-    # Create oauth_tokens table
-    op.create_table(
-        'oauth_tokens',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('provider', sa.String(), nullable=False),
-        sa.Column('access_token', sa.Text(), nullable=False),
-        sa.Column('refresh_token', sa.Text(), nullable=True),
-        sa.Column('expires_at', sa.DateTime(), nullable=True),
-        sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_oauth_tokens_id'), 'oauth_tokens', ['id'], unique=False)
-    op.create_index(op.f('ix_oauth_tokens_provider'), 'oauth_tokens', ['provider'], unique=False)
-    op.create_index(op.f('ix_oauth_tokens_user_id'), 'oauth_tokens', ['user_id'], unique=False)
-
-    # Create settings table
-    op.create_table(
-        'settings',
-        sa.Column('id', sa.Integer(), nullable=False),
-        sa.Column('key', sa.String(), nullable=False),
-        sa.Column('value', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
-        sa.Column('user_id', sa.Integer(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False),
-        sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
-        sa.PrimaryKeyConstraint('id')
-    )
-    op.create_index(op.f('ix_settings_id'), 'settings', ['id'], unique=False)
-    op.create_index(op.f('ix_settings_key'), 'settings', ['key'], unique=False)
-    op.create_index(op.f('ix_settings_user_id'), 'settings', ['user_id'], unique=False)
+    
+    # All tables and their indexes in one batch instead of one round-trip per statement
+    op.execute(_create_sql())
 
 
 def downgrade() -> None:
     # Drop tables in reverse order
-    op.drop_table('settings')
-    op.drop_table('oauth_tokens')
-    op.drop_table('gmail_threads')
-    op.drop_table('logs')
-    op.drop_table('policy')
-    op.drop_table('prompts')
-    op.drop_table('agents')
-    op.drop_table('summaries')
-    op.drop_table('embeddings')
-    op.drop_table('messages')
-    op.drop_table('users')
+    op.execute("DROP TABLE " + ", ".join(table for table, _, _ in reversed(_TABLES)) + ";")
     
     # Drop pgvector extension
     op.execute('DROP EXTENSION IF EXISTS vector;')
-
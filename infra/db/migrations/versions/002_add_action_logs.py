@@ -19,12 +19,11 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # Create action_logs table if it doesn't exist
-    from sqlalchemy import inspect
+    # Create action_logs table if it doesn't exist (single catalog lookup, not a full reflection)
     conn = op.get_bind()
-    inspector = inspect(conn)
+    exists = conn.execute(sa.text("SELECT to_regclass('public.action_logs') IS NOT NULL")).scalar()
     
-    if 'action_logs' not in inspector.get_table_names():
+    if not exists:
         op.create_table(
         'action_logs',
         sa.Column('id', sa.Integer(), nullable=False),
@@ -29,7 +29,7 @@ def upgrade() -> None:
     op.create_index('ix_messages_recipient', 'messages', ['recipient'], unique=False)
     
     # Add index on recipients using GIN for JSONB queries
-    op.execute("CREATE INDEX ix_messages_recipients ON messages USING GIN (recipients);")
+    op.create_index('ix_messages_recipients', 'messages', ['recipients'], unique=False, postgresql_using='gin')
 
 
 def downgrade() -> None:
@@ -39,11 +39,13 @@ def upgrade() -> None:
     
     # Create unique constraint: only one leader per user (partial unique constraint)
     # Using unique index with WHERE clause (PostgreSQL partial unique constraint)
-    op.execute("""
-        CREATE UNIQUE INDEX uq_user_minimee_leader 
-        ON agents (user_id) 
-        WHERE is_minimee_leader = true
-    """)
+    op.create_index(
+        'uq_user_minimee_leader',
+        'agents',
+        ['user_id'],
+        unique=True,
+        postgresql_where=sa.text('is_minimee_leader = true')
+    )
     
     # Migration: Mark existing "Minimee" agent as leader if exists
     op.execute("""
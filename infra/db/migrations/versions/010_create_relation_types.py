@@ -46,15 +46,6 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('contact_id', 'relation_type_id')
     )
     
-    # Create indexes
-    op.create_index('ix_relation_types_category', 'relation_types', ['category'], unique=False)
-    op.create_index('ix_relation_types_category_order', 'relation_types', ['category', 'display_order'], unique=False)
-    op.create_index('ix_relation_types_code', 'relation_types', ['code'], unique=True)
-    op.create_index('ix_relation_types_is_active', 'relation_types', ['is_active'], unique=False)
-    op.create_index('ix_contact_relation_types_contact', 'contact_relation_types', ['contact_id'], unique=False)
-    op.create_index('ix_contact_relation_types_type', 'contact_relation_types', ['relation_type_id'], unique=False)
-    op.create_index('ix_contact_relation_types_composite', 'contact_relation_types', ['contact_id', 'relation_type_id'], unique=True)
-    
     # Seed relation types
     connection = op.get_bind()
     
@@ -79,14 +70,18 @@ def upgrade() -> None:
     
     all_types = personnel_types + professionnel_types
     
-    for rt in all_types:
-        connection.execute(
-            sa.text("""
-                INSERT INTO relation_types (code, label_masculin, label_feminin, label_autre, category, display_order, is_active)
-                VALUES (:code, :label_masculin, :label_feminin, :label_autre, :category, :display_order, true)
-            """),
-            rt
-        )
+    # One multi-row INSERT for the whole seed
+    relation_types = sa.table(
+        'relation_types',
+        sa.column('code', sa.String),
+        sa.column('label_masculin', sa.String),
+        sa.column('label_feminin', sa.String),
+        sa.column('label_autre', sa.String),
+        sa.column('category', sa.String),
+        sa.column('display_order', sa.Integer),
+        sa.column('is_active', sa.Boolean),
+    )
+    connection.execute(sa.insert(relation_types).values([{**rt, 'is_active': True} for rt in all_types]))
     
     # Migrate existing relation_type data from contacts table
     # Map old string values to new relation_type IDs
@@ -106,46 +101,43 @@ def upgrade() -> None:
         'autre': 'autre_personnel',  # Default to personnel
     }
     
-    # Get all contacts with relation_type
-    result = connection.execute(sa.text("SELECT id, relation_type FROM contacts WHERE relation_type IS NOT NULL"))
-    contacts = result.fetchall()
+    # One INSERT ... SELECT: each contact takes the exact mapping match, otherwise the first (in mapping
+    # order) key contained in its value or containing it
+    pairs = list(mapping.items())
+    values_sql = ", ".join(f"({i}, :old_{i}, :code_{i})" for i in range(len(pairs)))
+    params = {}
+    for i, (old_key, new_code) in enumerate(pairs):
+        params[f"old_{i}"] = old_key
+        params[f"code_{i}"] = new_code
+    connection.execute(
+        sa.text(f"""
+            INSERT INTO contact_relation_types (contact_id, relation_type_id)
+            SELECT c.id, rt.id
+            FROM contacts c
+            CROSS JOIN LATERAL (
+                SELECT m.code
+                FROM (VALUES {values_sql}) AS m(ord, old, code)
+                WHERE m.old = lower(btrim(c.relation_type))
+                   OR strpos(lower(btrim(c.relation_type)), m.old) > 0
+                   OR strpos(m.old, lower(btrim(c.relation_type))) > 0
+                ORDER BY m.old = lower(btrim(c.relation_type)) DESC, m.ord
+                LIMIT 1
+            ) AS matched
+            JOIN relation_types rt ON rt.code = matched.code
+            WHERE c.relation_type IS NOT NULL
+            ON CONFLICT (contact_id, relation_type_id) DO NOTHING
+        """),
+        params
+    )
     
-    for contact_id, old_relation_type in contacts:
-        # Find matching code (case-insensitive, handle variations)
-        old_lower = old_relation_type.lower().strip()
-        code = None
-        
-        # Try exact match first
-        if old_lower in mapping:
-            code = mapping[old_lower]
-        else:
-            # Try partial matches
-            for old_key, new_code in mapping.items():
-                if old_key in old_lower or old_lower in old_key:
-                    code = new_code
-                    break
-        
-        if code:
-            # Get relation_type_id for this code
-            rt_result = connection.execute(
-                sa.text("SELECT id FROM relation_types WHERE code = :code"),
-                {'code': code}
-            )
-            rt_row = rt_result.fetchone()
-            if rt_row:
-                rt_id = rt_row[0]
-                # Insert into junction table
-                try:
-                    connection.execute(
-                        sa.text("""
-                            INSERT INTO contact_relation_types (contact_id, relation_type_id)
-                            VALUES (:contact_id, :relation_type_id)
-                        """),
-                        {'contact_id': contact_id, 'relation_type_id': rt_id}
-                    )
-                except Exception:
-                    # Ignore duplicates
-                    pass
+    # Create indexes once the seed and the legacy data are in
+    op.create_index('ix_relation_types_category', 'relation_types', ['category'], unique=False)
+    op.create_index('ix_relation_types_category_order', 'relation_types', ['category', 'display_order'], unique=False)
+    op.create_index('ix_relation_types_code', 'relation_types', ['code'], unique=True)
+    op.create_index('ix_relation_types_is_active', 'relation_types', ['is_active'], unique=False)
+    op.create_index('ix_contact_relation_types_contact', 'contact_relation_types', ['contact_id'], unique=False)
+    op.create_index('ix_contact_relation_types_type', 'contact_relation_types', ['relation_type_id'], unique=False)
+    op.create_index('ix_contact_relation_types_composite', 'contact_relation_types', ['contact_id', 'relation_type_id'], unique=True)
 
 
 def downgrade() -> None:
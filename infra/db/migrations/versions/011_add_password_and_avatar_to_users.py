@@ -6,7 +6,6 @@ Create Date: 2024-11-11 17:00:00.000000
 
 """
 from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,17 +16,9 @@ depends_on = None
 
 
 def upgrade():
-    # Add password_hash column if it doesn't exist
-    conn = op.get_bind()
-    inspector = sa.inspect(conn)
-    columns = [col['name'] for col in inspector.get_columns('users')]
-    
-    if 'password_hash' not in columns:
-        op.add_column('users', sa.Column('password_hash', sa.String(), nullable=True))
-    
-    # Add avatar_url column if it doesn't exist
-    if 'avatar_url' not in columns:
-        op.add_column('users', sa.Column('avatar_url', sa.String(), nullable=True))
+    # Add password_hash and avatar_url columns if they don't exist (no reflection of users needed)
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash VARCHAR")
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS avatar_url VARCHAR")
 
 
 def downgrade():
@@ -39,12 +39,6 @@ def upgrade() -> None:
     # Create unique constraint: code must be unique per user (or globally for system categories)
     op.create_unique_constraint('uq_contact_categories_code_user', 'contact_categories', ['code', 'user_id'])
     
-    # Create indexes
-    op.create_index('ix_contact_categories_code', 'contact_categories', ['code'], unique=False)
-    op.create_index('ix_contact_categories_user_id', 'contact_categories', ['user_id'], unique=False)
-    op.create_index('ix_contact_categories_category_type', 'contact_categories', ['category_type'], unique=False)
-    op.create_index('ix_contact_categories_is_system', 'contact_categories', ['is_system'], unique=False)
-    
     # Seed system categories
     connection = op.get_bind()
     
@@ -59,14 +53,27 @@ def upgrade() -> None:
         {'code': 'autres', 'label': 'Autres', 'category_type': 'autre', 'display_order': 8},
     ]
     
-    for cat in system_categories:
-        connection.execute(
-            sa.text("""
-                INSERT INTO contact_categories (code, label, category_type, is_system, user_id, display_order)
-                VALUES (:code, :label, :category_type, true, NULL, :display_order)
-            """),
-            cat
+    # One multi-row INSERT for the whole seed
+    contact_categories = sa.table(
+        'contact_categories',
+        sa.column('code', sa.String),
+        sa.column('label', sa.String),
+        sa.column('category_type', sa.String),
+        sa.column('is_system', sa.Boolean),
+        sa.column('user_id', sa.Integer),
+        sa.column('display_order', sa.Integer),
+    )
+    connection.execute(
+        sa.insert(contact_categories).values(
+            [{**cat, 'is_system': True, 'user_id': None} for cat in system_categories]
         )
+    )
+    
+    # Create indexes once the seed is in
+    op.create_index('ix_contact_categories_code', 'contact_categories', ['code'], unique=False)
+    op.create_index('ix_contact_categories_user_id', 'contact_categories', ['user_id'], unique=False)
+    op.create_index('ix_contact_categories_category_type', 'contact_categories', ['category_type'], unique=False)
+    op.create_index('ix_contact_categories_is_system', 'contact_categories', ['is_system'], unique=False)
 
 
 def downgrade() -> None:
@@ -10,6 +10,8 @@ from typing import Sequence, Union
 from alembic import op
 import sqlalchemy as sa
 
+from migration_utils import create_index_concurrent
+
 # revision identifiers, used by Alembic.
 revision: str = '015'
 down_revision: Union[str, None] = '014'
@@ -17,62 +19,28 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
-def upgrade() -> None:
-    # Add contact_category_id column to contacts table
-    op.add_column('contacts', sa.Column('contact_category_id', sa.Integer(), nullable=True))
-    
-    # Add foreign key constraint
-    op.create_foreign_key(
-        'fk_contacts_contact_category_id',
-        'contacts',
-        'contact_categories',
-        ['contact_category_id'],
-        ['id'],
-        ondelete='SET NULL'
-    )
-    
-    # Create index
-    op.create_index('ix_contacts_contact_category_id', 'contacts', ['contact_category_id'], unique=False)
-    
-    # Try to classify existing contacts based on their relation_types
+def _classify_contacts() -> None:
     connection = op.get_bind()
     
-    # Map relation_type categories to contact_categories
-    category_mapping = {
-        'personnel': 'contacts_perso',
-        'professionnel': 'contacts_pro',
-    }
-    
-    # Get relation_types and their categories
-    rt_result = connection.execute(
+    # Classify existing contacts based on their relation_types: map relation_type categories to
+    # contact_categories (personnel -> contacts_perso, professionnel -> contacts_pro) in one UPDATE ... FROM
+    connection.execute(
         sa.text("""
-            SELECT DISTINCT rt.category, c.id as contact_id
-            FROM contacts c
-            JOIN contact_relation_types crt ON c.id = crt.contact_id
+            UPDATE contacts
+            SET contact_category_id = cc.id
+            FROM contact_relation_types crt
             JOIN relation_types rt ON crt.relation_type_id = rt.id
-            WHERE c.contact_category_id IS NULL
+            JOIN contact_categories cc
+                ON cc.is_system = true
+                AND cc.code = CASE rt.category
+                    WHEN 'personnel' THEN 'contacts_perso'
+                    WHEN 'professionnel' THEN 'contacts_pro'
+                END
+            WHERE contacts.id = crt.contact_id
+            AND contacts.contact_category_id IS NULL
         """)
     )
     
-    contacts_to_update = rt_result.fetchall()
-    
-    for category, contact_id in contacts_to_update:
-        if category in category_mapping:
-            category_code = category_mapping[category]
-            # Get contact_category_id for this code
-            cat_result = connection.execute(
-                sa.text("SELECT id FROM contact_categories WHERE code = :code AND is_system = true"),
-                {'code': category_code}
-            )
-            cat_row = cat_result.fetchone()
-            if cat_row:
-                cat_id = cat_row[0]
-                # Update contact
-                connection.execute(
-                    sa.text("UPDATE contacts SET contact_category_id = :cat_id WHERE id = :contact_id"),
-                    {'cat_id': cat_id, 'contact_id': contact_id}
-                )
-    
     # Set default category 'autres' for contacts without category
     autres_result = connection.execute(
         sa.text("SELECT id FROM contact_categories WHERE code = 'autres' AND is_system = true")
@@ -86,6 +54,36 @@ def upgrade() -> None:
         )
 
 
+def upgrade() -> None:
+    connection = op.get_bind()
+    
+    # Add contact_category_id column to contacts table
+    # (idempotent: the backfill below commits on its own, so a failed run is resumed by running 015 again)
+    op.execute("ALTER TABLE contacts ADD COLUMN IF NOT EXISTS contact_category_id INTEGER")
+    
+    # Add foreign key constraint
+    fk_exists = connection.execute(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fk_contacts_contact_category_id')")
+    ).scalar()
+    if not fk_exists:
+        op.create_foreign_key(
+            'fk_contacts_contact_category_id',
+            'contacts',
+            'contact_categories',
+            ['contact_category_id'],
+            ['id'],
+            ondelete='SET NULL'
+        )
+    
+    # Classify existing contacts outside the migration transaction: the ALTER TABLE lock is released
+    # first and each UPDATE commits on its own (both only touch rows still without a category)
+    with op.get_context().autocommit_block():
+        _classify_contacts()
+    
+    # Index built after the backfill (the UPDATEs above do not maintain it), without blocking contact writes
+    create_index_concurrent('ix_contacts_contact_category_id', 'contacts', 'contact_category_id')
+
+
 def downgrade() -> None:
     # Drop index
     op.drop_index('ix_contacts_contact_category_id', table_name='contacts')
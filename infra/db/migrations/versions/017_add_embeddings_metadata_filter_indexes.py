@@ -0,0 +1,30 @@
+"""add_embeddings_metadata_filter_indexes
+
+Revision ID: 017
+Revises: 016
+Create Date: 2025-01-24 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '017'
+down_revision: Union[str, None] = '016'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expression indexes for the metadata filters of semantic search
+    # (conversation filter matches conversation_id OR thread_id, so both are indexed for a BitmapOr)
+    create_index_concurrent('ix_embeddings_metadata_conversation_id', 'embeddings', "(metadata->>'conversation_id')")
+    create_index_concurrent('ix_embeddings_metadata_thread_id', 'embeddings', "(metadata->>'thread_id')")
+    create_index_concurrent('ix_embeddings_metadata_language', 'embeddings', "(metadata->>'language')")
+
+
+def downgrade() -> None:
+    drop_index_concurrent('ix_embeddings_metadata_language')
+    drop_index_concurrent('ix_embeddings_metadata_thread_id')
+    drop_index_concurrent('ix_embeddings_metadata_conversation_id')
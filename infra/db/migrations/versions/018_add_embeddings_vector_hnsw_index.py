@@ -0,0 +1,40 @@
+"""add_embeddings_vector_hnsw_index
+
+Revision ID: 018
+Revises: 017
+Create Date: 2025-01-25 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '018'
+down_revision: Union[str, None] = '017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # HNSW graph index for semantic search (ORDER BY vector <=> query), replaces the seq scan + sort
+    # Cosine op class: MiniLM embeddings are compared with <=> everywhere
+    # Query paths keep the pgvector default recall/speed trade-off (SET hnsw.ef_search = 40 per session to tune)
+    # The concurrent build runs outside a transaction, so build settings are session-level and reset after
+    op.execute("SET maintenance_work_mem = '2GB'")
+    op.execute("SET max_parallel_maintenance_workers = 7")
+    create_index_concurrent(
+        'ix_embeddings_vector_hnsw',
+        'embeddings',
+        'vector vector_cosine_ops',
+        'WITH (m = 16, ef_construction = 64)',
+        using='hnsw'
+    )
+    op.execute("RESET maintenance_work_mem")
+    op.execute("RESET max_parallel_maintenance_workers")
+
+
+def downgrade() -> None:
+    drop_index_concurrent('ix_embeddings_vector_hnsw')
@@ -0,0 +1,79 @@
+"""size_adaptive_embeddings_hnsw_params
+
+Revision ID: 019
+Revises: 018
+Create Date: 2025-01-25 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '019'
+down_revision: Union[str, None] = '018'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _hnsw_params(n: int) -> dict:
+    """
+    HNSW build parameters sized for a corpus of n embeddings
+    Small corpora keep a cheap graph, large ones get more edges to hold recall@10;
+    ef_search is the matching query-time candidate list size
+    """
+    if n < 100_000:
+        return {"m": 16, "ef_construction": 64, "ef_search": 40}
+    if n < 1_000_000:
+        return {"m": 24, "ef_construction": 100, "ef_search": 64}
+    return {"m": 32, "ef_construction": 128, "ef_search": 100}
+
+
+def _create_hnsw_index(name: str, params: dict) -> None:
+    op.execute("SET maintenance_work_mem = '2GB'")
+    op.execute("SET max_parallel_maintenance_workers = 7")
+    create_index_concurrent(
+        name,
+        'embeddings',
+        'vector vector_cosine_ops',
+        'WITH (m = %d, ef_construction = %d)' % (params["m"], params["ef_construction"]),
+        using='hnsw'
+    )
+    op.execute("RESET maintenance_work_mem")
+    op.execute("RESET max_parallel_maintenance_workers")
+
+
+def _rebuild_hnsw_index(params: dict) -> None:
+    # Build the replacement next to the current index, so searches keep an index until the swap
+    _create_hnsw_index('ix_embeddings_vector_hnsw_rebuild', params)
+    drop_index_concurrent('ix_embeddings_vector_hnsw')
+    op.execute("ALTER INDEX ix_embeddings_vector_hnsw_rebuild RENAME TO ix_embeddings_vector_hnsw")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    params = _hnsw_params(conn.execute(sa.text("SELECT count(*) FROM embeddings")).scalar())
+    
+    # Rebuild the index from 018 with parameters matching the current corpus size
+    _rebuild_hnsw_index(params)
+    
+    # Record the parameters so the query layer can SET LOCAL hnsw.ef_search accordingly
+    conn.execute(
+        sa.text("DELETE FROM settings WHERE key = 'hnsw_params' AND user_id IS NULL")
+    )
+    conn.execute(
+        sa.text("""
+            INSERT INTO settings (key, value, user_id, created_at, updated_at)
+            VALUES ('hnsw_params', CAST(:value AS jsonb), NULL, NOW(), NOW())
+        """),
+        {"value": json.dumps(params)}
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM settings WHERE key = 'hnsw_params' AND user_id IS NULL")
+    _rebuild_hnsw_index(_hnsw_params(0))
@@ -0,0 +1,58 @@
+"""embeddings_vector_to_halfvec
+
+Revision ID: 020
+Revises: 019
+Create Date: 2025-01-26 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '020'
+down_revision: Union[str, None] = '019'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _hnsw_build_params() -> tuple:
+    """(m, ef_construction) recorded by migration 019, pgvector defaults otherwise"""
+    value = op.get_bind().execute(
+        sa.text("SELECT value FROM settings WHERE key = 'hnsw_params' AND user_id IS NULL")
+    ).scalar()
+    value = value or {}
+    return value.get("m", 16), value.get("ef_construction", 64)
+
+
+def _rebuild_hnsw_index(ops: str) -> None:
+    m, ef_construction = _hnsw_build_params()
+    op.execute("SET LOCAL maintenance_work_mem = '2GB'")
+    op.execute("SET LOCAL max_parallel_maintenance_workers = 7")
+    op.execute(
+        "CREATE INDEX ix_embeddings_vector_hnsw ON embeddings "
+        "USING hnsw (vector %s) WITH (m = %d, ef_construction = %d)" % (ops, m, ef_construction)
+    )
+
+
+def upgrade() -> None:
+    # halfvec (16-bit floats) halves the bytes read per distance computation and the HNSW graph size;
+    # normalized MiniLM embeddings lose no meaningful precision
+    version = op.get_bind().execute(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    ).scalar()
+    if tuple(int(part) for part in version.split(".")[:2]) < (0, 7):
+        raise RuntimeError(
+            f"halfvec requires pgvector >= 0.7.0 (installed: {version}), run ALTER EXTENSION vector UPDATE first"
+        )
+    
+    op.drop_index('ix_embeddings_vector_hnsw', table_name='embeddings')
+    op.execute("ALTER TABLE embeddings ALTER COLUMN vector TYPE halfvec(384) USING vector::halfvec(384)")
+    _rebuild_hnsw_index('halfvec_cosine_ops')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_embeddings_vector_hnsw', table_name='embeddings')
+    op.execute("ALTER TABLE embeddings ALTER COLUMN vector TYPE vector(384) USING vector::vector(384)")
+    _rebuild_hnsw_index('vector_cosine_ops')
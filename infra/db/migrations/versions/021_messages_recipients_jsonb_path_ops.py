@@ -0,0 +1,26 @@
+"""messages_recipients_jsonb_path_ops
+
+Revision ID: 021
+Revises: 020
+Create Date: 2025-01-26 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import rebuild_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '021'
+down_revision: Union[str, None] = '020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Recipient lookups only use containment (recipients @> '["jid"]'), which jsonb_path_ops
+    # serves with a smaller index than the default jsonb_ops
+    rebuild_index_concurrent('ix_messages_recipients', 'messages', 'recipients jsonb_path_ops', using='gin')
+
+
+def downgrade() -> None:
+    rebuild_index_concurrent('ix_messages_recipients', 'messages', 'recipients', using='gin')
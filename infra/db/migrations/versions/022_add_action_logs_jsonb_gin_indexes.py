@@ -0,0 +1,30 @@
+"""add_action_logs_jsonb_gin_indexes
+
+Revision ID: 022
+Revises: 021
+Create Date: 2025-01-26 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '022'
+down_revision: Union[str, None] = '021'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_JSONB_COLUMNS = ('metadata', 'input_data', 'output_data')
+
+
+def upgrade() -> None:
+    # GIN (jsonb_path_ops) indexes for containment filters (@>) on the action log payloads
+    # CONCURRENTLY keeps action logging (written on every request) unblocked
+    for column in _JSONB_COLUMNS:
+        create_index_concurrent(f'ix_action_logs_{column}_gin', 'action_logs', f'{column} jsonb_path_ops', using='gin')
+
+
+def downgrade() -> None:
+    for column in reversed(_JSONB_COLUMNS):
+        drop_index_concurrent(f'ix_action_logs_{column}_gin')
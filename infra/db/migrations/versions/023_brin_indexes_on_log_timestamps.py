@@ -0,0 +1,35 @@
+"""brin_indexes_on_log_timestamps
+
+Revision ID: 023
+Revises: 022
+Create Date: 2025-01-27 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '023'
+down_revision: Union[str, None] = '022'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # logs and action_logs are append-only with timestamp = insert time, so a BRIN index (one summary
+    # per 32 pages) serves their date-range filters at a fraction of the BTREE size and insert cost.
+    # messages.timestamp (imported history, not monotonic) and ingestion_jobs.created_at (small table,
+    # ORDER BY ... LIMIT) keep their BTREE; action_logs(request_id, timestamp) stays for point lookups.
+    # Each BRIN index is built before the BTREE it replaces is dropped.
+    create_index_concurrent('ix_logs_timestamp_brin', 'logs', 'timestamp', 'WITH (pages_per_range = 32)', using='brin')
+    drop_index_concurrent('ix_logs_timestamp')
+    create_index_concurrent('ix_action_logs_timestamp_brin', 'action_logs', 'timestamp', 'WITH (pages_per_range = 32)', using='brin')
+    drop_index_concurrent('ix_action_logs_timestamp')
+
+
+def downgrade() -> None:
+    create_index_concurrent('ix_action_logs_timestamp', 'action_logs', 'timestamp')
+    drop_index_concurrent('ix_action_logs_timestamp_brin')
+    create_index_concurrent('ix_logs_timestamp', 'logs', 'timestamp')
+    drop_index_concurrent('ix_logs_timestamp_brin')
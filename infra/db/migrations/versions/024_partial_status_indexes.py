@@ -0,0 +1,34 @@
+"""partial_status_indexes
+
+Revision ID: 024
+Revises: 023
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '024'
+down_revision: Union[str, None] = '023'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Status columns have a handful of values and the hot queries only probe live rows,
+    # so index those rows only (same partial-index pattern as uq_user_minimee_leader in 006)
+    # Reminder scan: status = 'pending' AND created_at <= threshold
+    create_index_concurrent('ix_pending_approvals_pending', 'pending_approvals', 'created_at', "WHERE status = 'pending'")
+    drop_index_concurrent('ix_pending_approvals_status')
+    
+    create_index_concurrent('ix_whatsapp_integrations_connected', 'whatsapp_integrations', 'user_id', "WHERE status = 'connected'")
+    drop_index_concurrent('ix_whatsapp_integrations_status')
+
+
+def downgrade() -> None:
+    create_index_concurrent('ix_whatsapp_integrations_status', 'whatsapp_integrations', 'status')
+    drop_index_concurrent('ix_whatsapp_integrations_connected')
+    create_index_concurrent('ix_pending_approvals_status', 'pending_approvals', 'status')
+    drop_index_concurrent('ix_pending_approvals_pending')
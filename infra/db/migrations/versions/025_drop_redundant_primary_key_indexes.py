@@ -0,0 +1,34 @@
+"""drop_redundant_primary_key_indexes
+
+Revision ID: 025
+Revises: 024
+Create Date: 2025-01-27 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '025'
+down_revision: Union[str, None] = '024'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose migrations (001-005) indexed id on top of the primary key index
+_TABLES = (
+    'users', 'messages', 'embeddings', 'summaries', 'agents', 'prompts', 'policy', 'logs',
+    'gmail_threads', 'oauth_tokens', 'settings', 'action_logs', 'pending_approvals', 'whatsapp_integrations',
+)
+
+
+def upgrade() -> None:
+    # The primary key already has a unique BTREE on id: the extra index only costs writes and cache.
+    # IF EXISTS: action_logs may predate 002, which only indexed it when creating the table
+    for table in _TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_id")
+
+
+def downgrade() -> None:
+    for table in reversed(_TABLES):
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
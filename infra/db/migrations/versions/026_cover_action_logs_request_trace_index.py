@@ -0,0 +1,42 @@
+"""cover_action_logs_request_trace_index
+
+Revision ID: 026
+Revises: 025
+Create Date: 2025-01-28 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_utils import rebuild_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '026'
+down_revision: Union[str, None] = '025'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Flow traces (action_type, duration_ms, status WHERE request_id = ? ORDER BY timestamp)
+    # become index-only scans once the traced columns are carried in the index
+    rebuild_index_concurrent(
+        'ix_action_logs_request_timestamp',
+        'action_logs',
+        'request_id, timestamp',
+        'INCLUDE (action_type, duration_ms, status)'
+    )
+    # Index-only scans skip the heap only for all-visible pages: vacuum this append-only table
+    # after inserts too, so the visibility map keeps up with the logging rate
+    op.execute("""
+        ALTER TABLE action_logs SET (
+            autovacuum_vacuum_insert_scale_factor = 0.05,
+            autovacuum_vacuum_scale_factor = 0.05
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE action_logs RESET (autovacuum_vacuum_insert_scale_factor, autovacuum_vacuum_scale_factor)")
+    rebuild_index_concurrent('ix_action_logs_request_timestamp', 'action_logs', 'request_id, timestamp')
@@ -0,0 +1,58 @@
+"""timestamptz_audit_columns
+
+Revision ID: 027
+Revises: 026
+Create Date: 2025-01-28 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '027'
+down_revision: Union[str, None] = '026'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Insert/update times of the 001 tables, written by the database from now on
+# (domain timestamps such as messages.timestamp or oauth_tokens.expires_at keep their type)
+_COLUMNS = {
+    'users': ('created_at', 'updated_at'),
+    'messages': ('created_at',),
+    'embeddings': ('created_at',),
+    'summaries': ('created_at', 'updated_at'),
+    'agents': ('created_at', 'updated_at'),
+    'prompts': ('created_at', 'updated_at'),
+    'policy': ('created_at', 'updated_at'),
+    'logs': ('timestamp',),
+    'gmail_threads': ('created_at',),
+    'oauth_tokens': ('created_at', 'updated_at'),
+    'settings': ('created_at', 'updated_at'),
+}
+
+
+def upgrade() -> None:
+    # Existing values were written with datetime.utcnow(): read them as UTC
+    # One ALTER TABLE per table so each table is rewritten once
+    for table, columns in _COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(
+                f"ALTER COLUMN {column} TYPE timestamptz USING {column} AT TIME ZONE 'UTC', "
+                f"ALTER COLUMN {column} SET DEFAULT now()"
+                for column in columns
+            )
+        )
+
+
+def downgrade() -> None:
+    for table, columns in _COLUMNS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            + ", ".join(
+                f"ALTER COLUMN {column} DROP DEFAULT, "
+                f"ALTER COLUMN {column} TYPE timestamp USING {column} AT TIME ZONE 'UTC'"
+                for column in columns
+            )
+        )
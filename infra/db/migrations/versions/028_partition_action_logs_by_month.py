@@ -0,0 +1,113 @@
+"""partition_action_logs_by_month
+
+Revision ID: 028
+Revises: 027
+Create Date: 2025-01-29 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '028'
+down_revision: Union[str, None] = '027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates the monthly partitions from from_month up to months_ahead months after the current one.
+# Called by this migration for the existing rows and by the backend (at startup, then daily) for the coming months.
+# Rows outside every partition land in action_logs_default; a month that already has rows there
+# cannot be given its own partition any more and is skipped with a notice.
+_ENSURE_PARTITIONS_FUNCTION = """
+    CREATE OR REPLACE FUNCTION ensure_action_logs_partitions(
+        months_ahead integer DEFAULT 3,
+        from_month date DEFAULT now()::date
+    ) RETURNS void LANGUAGE plpgsql AS $$
+    DECLARE
+        month_start date := date_trunc('month', from_month)::date;
+        last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+        partition_name text;
+    BEGIN
+        WHILE month_start <= last_month LOOP
+            partition_name := 'action_logs_' || to_char(month_start, '"y"YYYY"m"MM');
+            IF to_regclass(partition_name) IS NULL THEN
+                BEGIN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF action_logs FOR VALUES FROM (%L) TO (%L)',
+                        partition_name, month_start, (month_start + interval '1 month')::date
+                    );
+                    -- Keep the visibility map fresh for index-only scans (see migration 026)
+                    EXECUTE format(
+                        'ALTER TABLE %I SET (autovacuum_vacuum_insert_scale_factor = 0.05, autovacuum_vacuum_scale_factor = 0.05)',
+                        partition_name
+                    );
+                EXCEPTION WHEN check_violation THEN
+                    RAISE NOTICE '% not created: its rows are already in action_logs_default', partition_name;
+                END;
+            END IF;
+            month_start := (month_start + interval '1 month')::date;
+        END LOOP;
+    END;
+    $$;
+"""
+
+
+def _create_indexes() -> None:
+    # Same indexes as the unpartitioned table (002, 022, 023, 026); PostgreSQL creates them on every partition
+    for column in ('action_type', 'message_id', 'conversation_id', 'request_id', 'user_id'):
+        op.create_index(f'ix_action_logs_{column}', 'action_logs', [column], unique=False)
+    op.execute("""
+        CREATE INDEX ix_action_logs_request_timestamp
+        ON action_logs (request_id, timestamp)
+        INCLUDE (action_type, duration_ms, status)
+    """)
+    op.execute("CREATE INDEX ix_action_logs_timestamp_brin ON action_logs USING BRIN (timestamp) WITH (pages_per_range = 32);")
+    for column in ('metadata', 'input_data', 'output_data'):
+        op.execute(f"CREATE INDEX ix_action_logs_{column}_gin ON action_logs USING GIN ({column} jsonb_path_ops)")
+
+
+def _add_foreign_keys() -> None:
+    op.create_foreign_key('action_logs_message_id_fkey', 'action_logs', 'messages', ['message_id'], ['id'])
+    op.create_foreign_key('action_logs_user_id_fkey', 'action_logs', 'users', ['user_id'], ['id'])
+
+
+def _replace_table(partitioned: bool) -> None:
+    """Copy action_logs into a new (partitioned or plain) table with the same columns, then swap them"""
+    op.execute("ALTER TABLE action_logs RENAME TO action_logs_previous")
+    op.execute(
+        "CREATE TABLE action_logs (LIKE action_logs_previous INCLUDING DEFAULTS)"
+        + (" PARTITION BY RANGE (timestamp)" if partitioned else "")
+    )
+    if partitioned:
+        op.execute(_ENSURE_PARTITIONS_FUNCTION)
+        op.execute("SELECT ensure_action_logs_partitions(3, COALESCE((SELECT min(timestamp) FROM action_logs_previous)::date, now()::date))")
+        op.execute("CREATE TABLE action_logs_default PARTITION OF action_logs DEFAULT")
+    op.execute("INSERT INTO action_logs SELECT * FROM action_logs_previous")
+    
+    # The id sequence belongs to the old table: hand it over before dropping it
+    op.execute("ALTER SEQUENCE action_logs_id_seq OWNED BY action_logs.id")
+    op.execute("DROP TABLE action_logs_previous")
+    
+    # A primary key on a partitioned table must include the partition key
+    op.execute("ALTER TABLE action_logs ADD PRIMARY KEY " + ("(id, timestamp)" if partitioned else "(id)"))
+    _add_foreign_keys()
+    _create_indexes()
+
+
+def upgrade() -> None:
+    # Monthly range partitions: inserts touch one small partition, old months are dropped with
+    # DETACH/DROP PARTITION and timestamp ranges are pruned to the matching months
+    _replace_table(partitioned=True)
+
+
+def downgrade() -> None:
+    _replace_table(partitioned=False)
+    op.execute("""
+        ALTER TABLE action_logs SET (
+            autovacuum_vacuum_insert_scale_factor = 0.05,
+            autovacuum_vacuum_scale_factor = 0.05
+        )
+    """)
+    op.execute("DROP FUNCTION IF EXISTS ensure_action_logs_partitions(integer, date)")
@@ -0,0 +1,61 @@
+"""bigint_ids_on_append_tables
+
+Revision ID: 029
+Revises: 028
+Create Date: 2025-01-29 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '029'
+down_revision: Union[str, None] = '028'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# High-volume append tables whose SERIAL id becomes a BIGINT identity (users/agents stay INT4)
+_IDENTITY_TABLES = ('messages', 'embeddings', 'logs')
+
+# Columns referencing messages.id follow its type
+_MESSAGE_ID_REFERENCES = ('embeddings', 'action_logs', 'pending_approvals')
+
+
+def _serial_to_identity(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
+    op.execute(f"DROP SEQUENCE IF EXISTS {table}_id_seq")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id TYPE bigint")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+    # The identity starts at 1: continue after the existing rows
+    op.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+
+
+def _identity_to_serial(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id TYPE integer")
+    op.execute(f"CREATE SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+    op.execute(f"SELECT setval('{table}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {table}")
+
+
+def upgrade() -> None:
+    for table in _IDENTITY_TABLES:
+        _serial_to_identity(table)
+    for table in _MESSAGE_ID_REFERENCES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN message_id TYPE bigint")
+    
+    # action_logs is partitioned (028): identity columns on partitioned tables need PostgreSQL 17,
+    # so it keeps its sequence default, widened to bigint
+    op.execute("ALTER TABLE action_logs ALTER COLUMN id TYPE bigint")
+    op.execute("ALTER SEQUENCE action_logs_id_seq AS bigint")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE action_logs_id_seq AS integer")
+    op.execute("ALTER TABLE action_logs ALTER COLUMN id TYPE integer")
+    
+    for table in _MESSAGE_ID_REFERENCES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN message_id TYPE integer")
+    for table in reversed(_IDENTITY_TABLES):
+        _identity_to_serial(table)
@@ -0,0 +1,122 @@
+"""hash_partition_embeddings_by_user
+
+Revision ID: 030
+Revises: 029
+Create Date: 2025-01-30 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '030'
+down_revision: Union[str, None] = '029'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_PARTITIONS = 8
+
+# Owner of an existing embedding: its message, else the user_id/conversation recorded in its metadata (chunks)
+_OWNER_SQL = """
+    COALESCE(
+        m.user_id,
+        CASE WHEN e.metadata->>'user_id' ~ '^[0-9]+$' THEN (e.metadata->>'user_id')::integer END,
+        (
+            SELECT msg.user_id FROM messages msg
+            WHERE msg.conversation_id = COALESCE(e.metadata->>'conversation_id', e.metadata->>'thread_id')
+            LIMIT 1
+        )
+    )
+"""
+
+
+def _create_indexes() -> None:
+    # Same indexes as before (001, 017, 018-020); on the partitioned table each partition gets its own
+    # (smaller) HNSW graph
+    op.create_index('ix_embeddings_message_id', 'embeddings', ['message_id'], unique=False)
+    op.create_index('ix_embeddings_metadata_conversation_id', 'embeddings', [sa.text("(metadata->>'conversation_id')")], unique=False)
+    op.create_index('ix_embeddings_metadata_thread_id', 'embeddings', [sa.text("(metadata->>'thread_id')")], unique=False)
+    op.create_index('ix_embeddings_metadata_language', 'embeddings', [sa.text("(metadata->>'language')")], unique=False)
+    
+    value = op.get_bind().execute(
+        sa.text("SELECT value FROM settings WHERE key = 'hnsw_params' AND user_id IS NULL")
+    ).scalar() or {}
+    op.execute("SET LOCAL maintenance_work_mem = '2GB'")
+    op.execute("SET LOCAL max_parallel_maintenance_workers = 7")
+    op.execute(
+        "CREATE INDEX ix_embeddings_vector_hnsw ON embeddings USING hnsw (vector halfvec_cosine_ops) WITH (m = %d, ef_construction = %d)"
+        % (value.get("m", 16), value.get("ef_construction", 64))
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    orphans = conn.execute(sa.text(f"""
+        SELECT count(*) FROM embeddings e LEFT JOIN messages m ON m.id = e.message_id
+        WHERE {_OWNER_SQL} IS NULL
+    """)).scalar()
+    if orphans:
+        raise RuntimeError(
+            f"{orphans} embeddings have no resolvable user (no message, metadata user_id or known conversation): "
+            "delete or assign them before partitioning embeddings by user"
+        )
+    
+    op.execute("ALTER TABLE embeddings RENAME TO embeddings_previous")
+    # Key and index names are created once the previous table (which still holds them) is gone
+    op.execute("""
+        CREATE TABLE embeddings (
+            id bigint NOT NULL,
+            text text NOT NULL,
+            vector halfvec(384) NOT NULL,
+            metadata jsonb,
+            message_id bigint REFERENCES messages(id),
+            user_id integer NOT NULL REFERENCES users(id),
+            created_at timestamptz NOT NULL DEFAULT now()
+        ) PARTITION BY HASH (user_id)
+    """)
+    for remainder in range(_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE embeddings_p{remainder} PARTITION OF embeddings "
+            f"FOR VALUES WITH (modulus {_PARTITIONS}, remainder {remainder})"
+        )
+    op.execute(f"""
+        INSERT INTO embeddings (id, text, vector, metadata, message_id, user_id, created_at)
+        SELECT e.id, e.text, e.vector, e.metadata, e.message_id, {_OWNER_SQL}, e.created_at
+        FROM embeddings_previous e
+        LEFT JOIN messages m ON m.id = e.message_id
+    """)
+    op.execute("DROP TABLE embeddings_previous")
+    
+    # A primary key on a partitioned table must include the partition key;
+    # identity columns on partitioned tables need PostgreSQL 17, so ids come from a sequence
+    op.execute("ALTER TABLE embeddings ADD PRIMARY KEY (id, user_id)")
+    op.execute("CREATE SEQUENCE embeddings_id_seq AS bigint OWNED BY embeddings.id")
+    op.execute("SELECT setval('embeddings_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM embeddings")
+    op.execute("ALTER TABLE embeddings ALTER COLUMN id SET DEFAULT nextval('embeddings_id_seq')")
+    _create_indexes()
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE embeddings RENAME TO embeddings_partitioned")
+    op.execute("""
+        CREATE TABLE embeddings (
+            id bigint NOT NULL,
+            text text NOT NULL,
+            vector halfvec(384) NOT NULL,
+            metadata jsonb,
+            message_id bigint REFERENCES messages(id),
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute("""
+        INSERT INTO embeddings (id, text, vector, metadata, message_id, created_at)
+        SELECT id, text, vector, metadata, message_id, created_at FROM embeddings_partitioned
+    """)
+    op.execute("DROP TABLE embeddings_partitioned")
+    
+    op.execute("ALTER TABLE embeddings ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE embeddings ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY")
+    op.execute("SELECT setval(pg_get_serial_sequence('embeddings', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM embeddings")
+    _create_indexes()
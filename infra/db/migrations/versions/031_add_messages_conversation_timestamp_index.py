@@ -0,0 +1,31 @@
+"""add_messages_conversation_timestamp_index
+
+Revision ID: 031
+Revises: 030
+Create Date: 2025-01-30 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '031'
+down_revision: Union[str, None] = '030'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # "Last N messages of a conversation" reads this index in order and stops after N entries,
+    # instead of combining the conversation_id and timestamp indexes and sorting.
+    # It also serves conversation_id lookups, so the single-column index goes.
+    # ix_messages_timestamp stays for cross-conversation time ranges (chunking, embeddings filters).
+    # No INCLUDE (content): message bodies can exceed the BTREE entry size limit.
+    create_index_concurrent('ix_messages_conv_ts', 'messages', 'conversation_id, timestamp DESC')
+    drop_index_concurrent('ix_messages_conversation_id')
+
+
+def downgrade() -> None:
+    create_index_concurrent('ix_messages_conversation_id', 'messages', 'conversation_id')
+    drop_index_concurrent('ix_messages_conv_ts')
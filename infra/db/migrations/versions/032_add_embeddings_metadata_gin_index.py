@@ -0,0 +1,28 @@
+"""add_embeddings_metadata_gin_index
+
+Revision ID: 032
+Revises: 031
+Create Date: 2025-01-30 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '032'
+down_revision: Union[str, None] = '031'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filtered semantic search: metadata containment filters (source, language, sender, recipients)
+    # narrow the rows through this index, then exact distances are computed on what is left.
+    # Unfiltered search keeps reading the HNSW index (018); the two are not combined in one scan.
+    # embeddings is hash-partitioned (030): each partition is indexed concurrently, then attached.
+    create_index_concurrent('ix_embeddings_metadata_gin', 'embeddings', 'metadata jsonb_path_ops', using='gin')
+
+
+def downgrade() -> None:
+    drop_index_concurrent('ix_embeddings_metadata_gin')
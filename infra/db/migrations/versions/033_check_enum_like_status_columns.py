@@ -0,0 +1,35 @@
+"""check_enum_like_status_columns
+
+Revision ID: 033
+Revises: 032
+Create Date: 2025-01-30 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '033'
+down_revision: Union[str, None] = '032'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (constraint, table, condition): the documented values of the enum-like string columns
+# action_logs.action_type stays open: new action types are added with new features
+_CHECKS = [
+    ('ck_action_logs_status', 'action_logs', "status IN ('success', 'error', 'pending')"),
+    ('ck_pending_approvals_status', 'pending_approvals', "status IN ('pending', 'approved', 'rejected', 'expired')"),
+    ('ck_whatsapp_integrations_integration_type', 'whatsapp_integrations', "integration_type IN ('user', 'minimee')"),
+    ('ck_whatsapp_integrations_status', 'whatsapp_integrations', "status IN ('connected', 'disconnected', 'pending')"),
+]
+
+
+def upgrade() -> None:
+    for name, table, condition in _CHECKS:
+        op.create_check_constraint(name, table, condition)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_CHECKS):
+        op.drop_constraint(name, table, type_='check')
@@ -0,0 +1,78 @@
+"""optional_ivfflat_embeddings_index
+
+Revision ID: 034
+Revises: 033
+Create Date: 2025-01-31 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+import json
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+from config import settings
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '034'
+down_revision: Union[str, None] = '033'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Lists probed per query (pgvector default is 1); recorded for the query layer
+_IVFFLAT_PROBES = 10
+
+
+def upgrade() -> None:
+    # HNSW stays the default. VECTOR_INDEX_TYPE=ivfflat swaps it for IVFFlat, which builds much faster
+    # and keeps inserts cheap, for write-heavy corpora that are searched rarely. IVFFlat centroids come
+    # from the rows present at build time, so run this once the corpus is loaded.
+    if settings.vector_index_type != "ivfflat":
+        return
+    
+    conn = op.get_bind()
+    lists = max(100, int(math.sqrt(conn.execute(sa.text("SELECT count(*) FROM embeddings")).scalar())))
+    op.execute("SET maintenance_work_mem = '2GB'")
+    create_index_concurrent(
+        'ix_embeddings_vector_ivf',
+        'embeddings',
+        'vector halfvec_cosine_ops',
+        f'WITH (lists = {lists})',
+        using='ivfflat'
+    )
+    op.execute("RESET maintenance_work_mem")
+    drop_index_concurrent('ix_embeddings_vector_hnsw')
+    
+    # The query layer reads this to SET LOCAL ivfflat.probes instead of hnsw.ef_search
+    conn.execute(sa.text("DELETE FROM settings WHERE key = 'vector_index' AND user_id IS NULL"))
+    conn.execute(
+        sa.text("""
+            INSERT INTO settings (key, value, user_id, created_at, updated_at)
+            VALUES ('vector_index', CAST(:value AS jsonb), NULL, NOW(), NOW())
+        """),
+        {"value": json.dumps({"type": "ivfflat", "lists": lists, "probes": _IVFFLAT_PROBES})}
+    )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT to_regclass('ix_embeddings_vector_ivf') IS NULL")).scalar():
+        return
+    
+    # Restore the HNSW index with the parameters recorded by 019
+    params = conn.execute(
+        sa.text("SELECT value FROM settings WHERE key = 'hnsw_params' AND user_id IS NULL")
+    ).scalar() or {"m": 16, "ef_construction": 64}
+    op.execute("SET maintenance_work_mem = '2GB'")
+    create_index_concurrent(
+        'ix_embeddings_vector_hnsw',
+        'embeddings',
+        'vector halfvec_cosine_ops',
+        'WITH (m = %d, ef_construction = %d)' % (params["m"], params["ef_construction"]),
+        using='hnsw'
+    )
+    op.execute("RESET maintenance_work_mem")
+    drop_index_concurrent('ix_embeddings_vector_ivf')
+    op.execute("DELETE FROM settings WHERE key = 'vector_index' AND user_id IS NULL")
@@ -0,0 +1,40 @@
+"""drop_indexes_shadowed_by_composites
+
+Revision ID: 035
+Revises: 034
+Create Date: 2025-01-31 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '035'
+down_revision: Union[str, None] = '034'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, column): single-column indexes whose column leads a composite index or unique constraint
+# (ix_messages_conversation_id already went with ix_messages_conv_ts in 031)
+# Before deploying, confirm they are unused over a representative window:
+#   SELECT indexrelname, idx_scan FROM pg_stat_user_indexes WHERE indexrelname IN (...)
+_SHADOWED = [
+    ('ix_action_logs_request_id', 'action_logs', 'request_id'),  # ix_action_logs_request_timestamp
+    ('ix_whatsapp_integrations_user_id', 'whatsapp_integrations', 'user_id'),  # uq_user_integration_type
+    ('ix_contacts_user_id', 'contacts', 'user_id'),  # uq_user_conversation_contact
+    ('ix_user_info_user_id', 'user_info', 'user_id'),  # ix_user_info_user_type
+    ('ix_user_info_visibility_user_info', 'user_info_visibility', 'user_info_id'),  # ix_user_info_visibility_composite
+    ('ix_contact_categories_code', 'contact_categories', 'code'),  # uq_contact_categories_code_user
+]
+
+
+def upgrade() -> None:
+    # Each of these doubles the index maintenance of every write for lookups the composite already serves
+    for name, _, _ in _SHADOWED:
+        drop_index_concurrent(name)
+
+
+def downgrade() -> None:
+    for name, table, column in reversed(_SHADOWED):
+        create_index_concurrent(name, table, column)
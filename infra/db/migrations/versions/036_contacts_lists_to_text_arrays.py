@@ -0,0 +1,45 @@
+"""contacts_lists_to_text_arrays
+
+Revision ID: 036
+Revises: 035
+Create Date: 2025-01-31 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '036'
+down_revision: Union[str, None] = '035'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = ('languages', 'dominant_themes')
+
+
+def upgrade() -> None:
+    # Flat string lists: text[] is smaller than a JSONB array and supports &&, @> and ANY natively
+    # USING cannot hold a subquery, so the element expansion goes through a session-local function
+    op.execute("""
+        CREATE FUNCTION pg_temp.jsonb_to_text_array(value jsonb) RETURNS text[] AS $$
+            SELECT CASE WHEN jsonb_typeof(value) = 'array'
+                THEN COALESCE((SELECT array_agg(item) FROM jsonb_array_elements_text(value) AS item), '{}')
+            END
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    for column in _COLUMNS:
+        op.execute(
+            f"ALTER TABLE contacts ALTER COLUMN {column} TYPE text[] USING pg_temp.jsonb_to_text_array({column})"
+        )
+    for column in _COLUMNS:
+        create_index_concurrent(f'ix_contacts_{column}_gin', 'contacts', column, using='gin')
+
+
+def downgrade() -> None:
+    for column in reversed(_COLUMNS):
+        drop_index_concurrent(f'ix_contacts_{column}_gin')
+    for column in reversed(_COLUMNS):
+        op.execute(f"ALTER TABLE contacts ALTER COLUMN {column} TYPE jsonb USING to_jsonb({column})")
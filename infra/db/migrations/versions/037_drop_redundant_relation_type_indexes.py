@@ -0,0 +1,40 @@
+"""drop_redundant_relation_type_indexes
+
+Revision ID: 037
+Revises: 036
+Create Date: 2025-01-31 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '037'
+down_revision: Union[str, None] = '036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns, unique) duplicated by another index of 010
+# (ix_contact_categories_code from 014 already went in 035)
+_REDUNDANT = [
+    ('ix_relation_types_code', 'relation_types', 'code', True),  # relation_types_code_key (column unique)
+    ('ix_relation_types_category', 'relation_types', 'category', False),  # prefix of ix_relation_types_category_order
+    ('ix_contact_relation_types_composite', 'contact_relation_types', 'contact_id, relation_type_id', True),  # primary key
+    ('ix_contact_relation_types_contact', 'contact_relation_types', 'contact_id', False),  # prefix of the primary key
+]
+
+
+def upgrade() -> None:
+    for name, _, _, _ in _REDUNDANT:
+        drop_index_concurrent(name)
+
+
+def downgrade() -> None:
+    for name, table, columns, unique in reversed(_REDUNDANT):
+        if unique:
+            op.execute(f"CREATE UNIQUE INDEX {name} ON {table} ({columns})")
+        else:
+            create_index_concurrent(name, table, columns)
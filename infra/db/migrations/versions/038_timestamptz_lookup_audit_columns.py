@@ -0,0 +1,38 @@
+"""timestamptz_lookup_audit_columns
+
+Revision ID: 038
+Revises: 037
+Create Date: 2025-01-31 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '038'
+down_revision: Union[str, None] = '037'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Insert/update times of the tables created in 010-016, same treatment as the 001 tables in 027
+_TABLES = ('relation_types', 'user_info', 'user_info_visibility', 'contact_categories', 'conversation_sessions')
+
+
+def upgrade() -> None:
+    # Existing values were written with datetime.utcnow() or now() in a UTC session: read them as UTC
+    for table in _TABLES:
+        op.execute(
+            f"ALTER TABLE {table} "
+            "ALTER COLUMN created_at TYPE timestamptz USING created_at AT TIME ZONE 'UTC', "
+            "ALTER COLUMN updated_at TYPE timestamptz USING updated_at AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.execute(
+            f"ALTER TABLE {table} "
+            "ALTER COLUMN created_at TYPE timestamp USING created_at AT TIME ZONE 'UTC', "
+            "ALTER COLUMN updated_at TYPE timestamp USING updated_at AT TIME ZONE 'UTC'"
+        )
@@ -0,0 +1,25 @@
+"""drop_redundant_conversation_sessions_user_index
+
+Revision ID: 039
+Revises: 038
+Create Date: 2025-01-31 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migration_utils import create_index_concurrent, drop_index_concurrent
+
+# revision identifiers, used by Alembic.
+revision: str = '039'
+down_revision: Union[str, None] = '038'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # user_id leads ix_conversation_sessions_user_type (user_id, session_type) from 016
+    drop_index_concurrent('ix_conversation_sessions_user_id')
+
+
+def downgrade() -> None:
+    create_index_concurrent('ix_conversation_sessions_user_id', 'conversation_sessions', 'user_id')
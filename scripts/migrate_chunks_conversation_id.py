@@ -7,93 +7,95 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'backend'))
 
-from db.database import SessionLocal
-from models import Embedding, Message, Summary
+from db.database import engine
 from sqlalchemy import text as sql_text
-import json
 
-def migrate_chunks():
+# Chunks par page (un UPDATE ... FROM + un commit par page): assez pour amortir l'aller-retour et le commit,
+# assez peu pour garder des transactions et un volume de WAL par commit courts; au-delà de ~1000 le gain est nul
+BATCH_SIZE = 500
+
+def migrate_chunks(page_size: int = BATCH_SIZE):
     """
     Met à jour les chunks existants pour ajouter conversation_id dans leurs metadata
-    en utilisant summaries ou messages pour trouver le conversation_id
+    en retrouvant le premier message du chunk pour connaître son conversation_id
+    Les correspondances sont calculées une fois (table temporaire indexée sur le hash de la
+    première ligne), puis appliquées par pages de page_size chunks (pagination par id)
     """
-    db = SessionLocal()
+    # Une seule connexion (pas de Session, qui la rend au pool à chaque commit): les tables temporaires y restent
+    db = engine.connect()
     
     try:
-        # Trouver tous les chunks sans conversation_id dans metadata
-        query = sql_text("""
-            SELECT 
-                e.id,
-                e.metadata,
-                e.text
-            FROM embeddings e
-            WHERE e.metadata->>'chunk' = 'true'
-            AND (e.metadata->>'conversation_id' IS NULL 
-                 OR e.metadata->>'conversation_id' = '')
-            AND (e.metadata->>'thread_id' IS NULL 
-                 OR e.metadata->>'thread_id' = '')
-        """)
+        # Un seul parcours de messages: clé = md5 de la première ligne en minuscules
+        # (un chunk joint les "sender: content" de ses messages par des retours à la ligne, cf. services/chunking.py:
+        # sa première ligne est celle de son premier message; un préfixe de longueur fixe déborderait sur le suivant)
+        # Les summaries ne sont pas utilisés: leur texte est un résumé, il ne reprend jamais celui d'un chunk
+        db.execute(sql_text("""
+            CREATE TEMP TABLE _message_lookup AS
+            SELECT DISTINCT ON (k) md5(lower(split_part(sender || ': ' || content, chr(10), 1))) AS k, conversation_id
+            FROM messages
+            WHERE conversation_id IS NOT NULL
+            ORDER BY k, id
+        """))
+        db.execute(sql_text("CREATE INDEX ON _message_lookup (k)"))
         
-        chunks_to_update = db.execute(query).fetchall()
-        print(f"📊 Trouvé {len(chunks_to_update)} chunks sans conversation_id/thread_id")
+        # Chunks sans conversation_id/thread_id, page suivante après last_id;
+        # les chunks Gmail reçoivent aussi thread_id (jsonb_set sur le metadata existant, rien ne repasse par Python)
+        # Filtre complet en un seul jsonpath (@?): l'index GIN ix_embeddings_metadata_gin (migration 032) sert la
+        # partie chunk, le reste est vérifié sur les lignes trouvées; chunk vaut "true" (ingestion) ou true
+        # (chunking temps réel, Gmail), conversation_id/thread_id absents, null ou vides
+        update_page = sql_text("""
+            WITH page AS (
+                SELECT id, md5(lower(split_part(text, chr(10), 1))) AS k
+                FROM embeddings
+                WHERE metadata @? CAST('$ ? (
+                    (@.chunk == "true" || @.chunk == true)
+                    && !exists(@.conversation_id ? (@ != null && @ != ""))
+                    && !exists(@.thread_id ? (@ != null && @ != ""))
+                )' AS jsonpath)
+                AND id > :last_id
+                ORDER BY id
+                LIMIT :page_size
+            ),
+            matched AS (
+                SELECT page.id, m.conversation_id
+                FROM page
+                LEFT JOIN _message_lookup m ON m.k = page.k
+            ),
+            updated AS (
+                UPDATE embeddings e
+                SET metadata = CASE WHEN e.metadata->>'source' = 'gmail'
+                    THEN jsonb_set(
+                        jsonb_set(e.metadata, '{conversation_id}', to_jsonb(matched.conversation_id)),
+                        '{thread_id}', to_jsonb(matched.conversation_id)
+                    )
+                    ELSE jsonb_set(e.metadata, '{conversation_id}', to_jsonb(matched.conversation_id))
+                END
+                FROM matched
+                WHERE e.id = matched.id
+                AND matched.conversation_id IS NOT NULL
+                RETURNING e.id
+            )
+            SELECT
+                (SELECT max(id) FROM page) AS last_id,
+                (SELECT count(*) FROM page) AS scanned,
+                (SELECT count(*) FROM updated) AS updated
+        """)
         
         updated_count = 0
         skipped_count = 0
+        last_id = 0
         
-        for chunk_row in chunks_to_update:
-            chunk_id = chunk_row.id
-            current_metadata = chunk_row.metadata or {}
-            
-            # Essayer de trouver conversation_id via summaries
-            # On cherche un summary dont le texte contient des mots-clés du chunk
-            chunk_text_preview = chunk_row.text[:100] if chunk_row.text else ""
+        while True:
+            page = db.execute(update_page, {"last_id": last_id, "page_size": page_size}).one()
+            if not page.scanned:
+                break
             
-            # Méthode 1: Chercher via summaries qui pourraient correspondre
-            summary = db.query(Summary).filter(
-                Summary.summary_text.ilike(f'%{chunk_text_preview[:50]}%')
-            ).first()
-            
-            conversation_id = None
-            if summary:
-                conversation_id = summary.conversation_id
-                print(f"  ✓ Chunk {chunk_id}: trouvé via summary -> conversation_id = {conversation_id}")
-            else:
-                # Méthode 2: Chercher dans les messages avec même texte (moins fiable)
-                message = db.query(Message).filter(
-                    Message.content.ilike(f'%{chunk_text_preview[:50]}%')
-                ).first()
-                
-                if message:
-                    conversation_id = message.conversation_id
-                    print(f"  ✓ Chunk {chunk_id}: trouvé via message -> conversation_id = {conversation_id}")
-            
-            if conversation_id:
-                # Mettre à jour le metadata
-                updated_metadata = current_metadata.copy()
-                updated_metadata['conversation_id'] = conversation_id
-                
-                # Déterminer si c'est Gmail ou WhatsApp
-                if current_metadata.get('source') == 'gmail':
-                    updated_metadata['thread_id'] = conversation_id
-                
-                # Mettre à jour dans la DB
-                update_query = sql_text("""
-                    UPDATE embeddings
-                    SET metadata = :metadata::jsonb
-                    WHERE id = :chunk_id
-                """)
-                
-                db.execute(update_query, {
-                    "metadata": json.dumps(updated_metadata),
-                    "chunk_id": chunk_id
-                })
-                
-                updated_count += 1
-            else:
-                print(f"  ✗ Chunk {chunk_id}: impossible de trouver conversation_id, ignoré")
-                skipped_count += 1
-        
-        db.commit()
+            # Page traitée: commit avant la suivante
+            db.commit()
+            updated_count += page.updated
+            skipped_count += page.scanned - page.updated
+            print(f"  ✓ Chunks {last_id + 1}..{page.last_id}: {page.updated} mis à jour, {page.scanned - page.updated} ignorés")
+            last_id = page.last_id
         
         print(f"\n✅ Migration terminée:")
         print(f"  - Chunks mis à jour: {updated_count}")
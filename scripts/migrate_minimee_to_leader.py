@@ -9,75 +9,99 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'backend'))
 
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from sqlalchemy import case, exists, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, aliased
 from db.database import SessionLocal
 from models import Agent, WhatsAppIntegration
 
+DEFAULT_APPROVAL_RULES = {
+    "auto_approve_confidence_threshold": 0.7,
+    "auto_approve_simple_messages": True,
+    "require_approval_keywords": ["urgent", "important", "confidential"],
+    "max_auto_approve_length": 200
+}
+
 
-def migrate_minimee_to_leader(db: Session, user_id: int = 1) -> bool:
+def migrate_minimee_to_leader(db: Session, user_id: Optional[int] = None) -> int:
     """
-    Mark existing Minimee agent as leader and link to WhatsApp integration
+    Mark Minimee agents as leaders and link them to their WhatsApp integration
+    Runs as a single UPDATE for all users (or only user_id), skipping users
+    that already have a leader
     
     Args:
         db: Database session
-        user_id: User ID to migrate (default: 1)
+        user_id: Only migrate this user (default: all users)
     
     Returns:
-        True if migration successful, False otherwise
+        Number of agents marked as leader
     """
+    candidate = aliased(Agent)
+    leader = aliased(Agent)
+    integration = aliased(WhatsAppIntegration)
+    
+    # One Minimee agent per user without a leader (uq_user_minimee_leader allows a single one)
+    candidates = (
+        select(func.min(candidate.id))
+        .where(
+            candidate.name == "Minimee",
+            ~exists().where(
+                leader.user_id == candidate.user_id,
+                leader.is_minimee_leader.is_(True)
+            )
+        )
+        .group_by(candidate.user_id)
+    )
+    if user_id is not None:
+        candidates = candidates.where(candidate.user_id == user_id)
+    
+    # Minimee WhatsApp integration of the agent's user, if any
+    minimee_integration_id = (
+        select(func.min(integration.id))
+        .where(
+            integration.user_id == Agent.user_id,
+            integration.integration_type == 'minimee'
+        )
+        .scalar_subquery()
+    )
+    
     try:
-        # Check if there's already a leader
-        existing_leader = db.query(Agent).filter(
-            Agent.user_id == user_id,
-            Agent.is_minimee_leader == True
-        ).first()
-        
-        if existing_leader:
-            print(f"✓ Agent '{existing_leader.name}' is already the leader for user {user_id}")
-            return True
-        
-        # Find Minimee agent
-        minimee_agent = db.query(Agent).filter(
-            Agent.name == "Minimee",
-            Agent.user_id == user_id
-        ).first()
-        
-        if not minimee_agent:
-            print(f"⚠ No 'Minimee' agent found for user {user_id}")
-            return False
-        
-        # Find minimee WhatsApp integration
-        minimee_integration = db.query(WhatsAppIntegration).filter(
-            WhatsAppIntegration.user_id == user_id,
-            WhatsAppIntegration.integration_type == 'minimee'
-        ).first()
-        
-        # Update agent
-        minimee_agent.is_minimee_leader = True
-        minimee_agent.whatsapp_display_name = 'Minimee'
-        
-        if minimee_integration:
-            minimee_agent.whatsapp_integration_id = minimee_integration.id
-            print(f"✓ Linked Minimee agent to WhatsApp integration")
-        
-        # Set default approval rules if not set
-        if not minimee_agent.approval_rules:
-            minimee_agent.approval_rules = {
-                "auto_approve_confidence_threshold": 0.7,
-                "auto_approve_simple_messages": True,
-                "require_approval_keywords": ["urgent", "important", "confidential"],
-                "max_auto_approve_length": 200
-            }
-            print(f"✓ Set default approval rules")
-        
+        promoted = db.execute(
+            update(Agent)
+            .where(Agent.id.in_(candidates))
+            .values(
+                is_minimee_leader=True,
+                whatsapp_display_name='Minimee',
+                whatsapp_integration_id=func.coalesce(minimee_integration_id, Agent.whatsapp_integration_id),
+                # Default approval rules if not set
+                approval_rules=case(
+                    (
+                        or_(Agent.approval_rules.is_(None), Agent.approval_rules == literal({}, JSONB)),
+                        literal(DEFAULT_APPROVAL_RULES, JSONB)
+                    ),
+                    else_=Agent.approval_rules
+                )
+            )
+            .returning(Agent.user_id, Agent.name, Agent.whatsapp_integration_id)
+            .execution_options(synchronize_session=False)
+        ).all()
         db.commit()
-        print(f"✓ Successfully marked '{minimee_agent.name}' as leader for user {user_id}")
-        return True
-        
     except Exception as e:
         db.rollback()
         print(f"❌ Migration failed: {str(e)}")
-        return False
+        raise
+    
+    # One write for all users instead of a print per row
+    if promoted:
+        print("\n".join(
+            f"✓ Marked '{row.name}' as leader for user {row.user_id}"
+            + (" (linked to WhatsApp integration)" if row.whatsapp_integration_id else "")
+            for row in promoted
+        ))
+    
+    return len(promoted)
 
 
 def main():
@@ -86,26 +110,14 @@ def main():
     
     db = SessionLocal()
     try:
-        # Get all users with Minimee agents
-        users_with_minimee = db.query(Agent.user_id).filter(
-            Agent.name == "Minimee"
-        ).distinct().all()
+        promoted_count = migrate_minimee_to_leader(db)
         
-        if not users_with_minimee:
-            print("⚠ No Minimee agents found")
+        if not promoted_count:
+            print("⚠ No Minimee agent to migrate (none found, or every user already has a leader)")
             return
         
-        success_count = 0
-        for (user_id,) in users_with_minimee:
-            print(f"\n📋 Processing user {user_id}...")
-            if migrate_minimee_to_leader(db, user_id):
-                success_count += 1
-        
-        print(f"\n✅ Migration completed: {success_count}/{len(users_with_minimee)} users migrated")
+        print(f"\n✅ Migration completed: {promoted_count} agents marked as leader")
         
-    except Exception as e:
-        print(f"\n❌ Migration failed: {str(e)}")
-        raise
     finally:
         db.close()
 
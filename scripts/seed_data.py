@@ -7,102 +7,136 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'apps', 'backend'))
 
+from typing import Dict, List, Tuple
+
+from sqlalchemy import and_, column, exists, insert, select, text, values
 from sqlalchemy.orm import Session
 from db.database import SessionLocal, engine
-from models import User, Agent, Prompt, Policy, Setting
-from datetime import datetime
-
-
-def seed_default_user(db: Session) -> User:
-    """Create default user if not exists"""
-    user = db.query(User).filter(User.id == 1).first()
-    if not user:
-        user = User(
-            id=1,
-            email="user@minimee.ai",
-            name="Minimee User",
-            created_at=datetime.utcnow()
-        )
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-        print(f"✓ Created default user: {user.email}")
-    else:
-        print(f"✓ Default user exists: {user.email}")
-    return user
-
-
-def seed_minimee_agent(db: Session, user_id: int) -> Agent:
-    """Create default Minimee agent"""
-    agent = db.query(Agent).filter(Agent.name == "Minimee", Agent.user_id == user_id).first()
-    if not agent:
-        agent = Agent(
-            name="Minimee",
-            role="Personal Assistant",
-            prompt="""You are Minimee, a personal AI assistant. Your role is to:
+from models import Prompt, Policy, Setting
+
+# Seed rows shared by every run, built once
+DEFAULT_USER = {
+    "user_id": 1,
+    "email": "user@minimee.ai",
+    "user_name": "Minimee User",
+}
+
+DEFAULT_AGENT = {
+    "agent_name": "Minimee",
+    "role": "Personal Assistant",
+    "prompt": """You are Minimee, a personal AI assistant. Your role is to:
 - Help users manage their communications (WhatsApp, Gmail)
 - Respond to messages in a style that matches the user's communication patterns
 - Learn from past conversations to provide contextually relevant responses
 - Always be helpful, professional, and empathetic
 - Ask for clarification when needed
 - Respect user privacy and data""",
-            style="Professional, friendly, and context-aware",
-            enabled=True,
-            user_id=user_id
+    "style": "Professional, friendly, and context-aware",
+}
+
+DEFAULT_PROMPTS = (
+    {
+        "name": "Greeting Response",
+        "content": "Generate a friendly greeting response that matches the sender's tone.",
+    },
+    {
+        "name": "Information Request",
+        "content": "Provide helpful information while being concise and accurate.",
+    },
+    {
+        "name": "Meeting Coordination",
+        "content": "Help coordinate meetings and schedules. Be clear about dates and times.",
+    },
+)
+
+DEFAULT_SETTINGS = (
+    {
+        "key": "llm_provider",
+        "value": {"provider": "ollama"}
+    },
+    {
+        "key": "embedding_model",
+        "value": {"model": "sentence-transformers/all-MiniLM-L6-v2"}
+    },
+    {
+        "key": "auto_indexing",
+        "value": {"enabled": True}
+    },
+)
+
+
+def _insert_missing(db: Session, model, rows: List[Dict], keys: List[str]) -> list:
+    """
+    Insert the rows that have no existing match on keys, in a single INSERT ... SELECT ... WHERE NOT EXISTS
+    (prompts, policy and settings have no unique constraint for ON CONFLICT)
+    Returns the inserted rows
+    """
+    table = model.__table__
+    names = list(rows[0])
+    candidates = values(*[column(name, table.c[name].type) for name in names], name="candidates").data(
+        [tuple(row[name] for name in names) for row in rows]
+    )
+    missing = select(candidates).where(
+        ~exists().where(and_(*[table.c[key] == candidates.c[key] for key in keys]))
+    )
+    return db.execute(insert(table).from_select(names, missing).returning(*table.c)).all()
+
+
+def seed_default_user_and_agent(db: Session) -> Tuple[int, int]:
+    """
+    Create default user and Minimee agent if not exist, in one statement
+    Returns (user_id, agent_id)
+    """
+    # Data-modifying CTEs: foreign keys are checked at the end of the statement, so the agent
+    # can reference a user inserted by the sibling CTE
+    seeded = db.execute(text("""
+        WITH new_user AS (
+            INSERT INTO users (id, email, name)
+            VALUES (:user_id, :email, :user_name)
+            ON CONFLICT (id) DO NOTHING
+            RETURNING id
+        ),
+        new_agent AS (
+            INSERT INTO agents (name, role, prompt, style, enabled, is_minimee_leader, user_id)
+            SELECT :agent_name, :role, :prompt, :style, true, false, :user_id
+            WHERE NOT EXISTS (SELECT 1 FROM agents WHERE name = :agent_name AND user_id = :user_id)
+            RETURNING id
         )
-        db.add(agent)
-        db.commit()
-        db.refresh(agent)
-        print(f"✓ Created default agent: {agent.name}")
+        SELECT
+            EXISTS (SELECT 1 FROM new_user) AS user_created,
+            EXISTS (SELECT 1 FROM new_agent) AS agent_created,
+            COALESCE(
+                (SELECT id FROM new_agent),
+                (SELECT min(id) FROM agents WHERE name = :agent_name AND user_id = :user_id)
+            ) AS agent_id
+    """), {**DEFAULT_USER, **DEFAULT_AGENT}).one()
+    
+    if seeded.user_created:
+        print(f"✓ Created default user: {DEFAULT_USER['email']}")
     else:
-        print(f"✓ Default agent exists: {agent.name}")
-    return agent
+        print("✓ Default user exists")
+    if seeded.agent_created:
+        print(f"✓ Created default agent: {DEFAULT_AGENT['agent_name']}")
+    else:
+        print(f"✓ Default agent exists: {DEFAULT_AGENT['agent_name']}")
+    return DEFAULT_USER["user_id"], seeded.agent_id
 
 
 def seed_default_prompts(db: Session, agent_id: int):
     """Create default prompts for Minimee agent"""
-    default_prompts = [
-        {
-            "name": "Greeting Response",
-            "content": "Generate a friendly greeting response that matches the sender's tone.",
-        },
-        {
-            "name": "Information Request",
-            "content": "Provide helpful information while being concise and accurate.",
-        },
-        {
-            "name": "Meeting Coordination",
-            "content": "Help coordinate meetings and schedules. Be clear about dates and times.",
-        },
-    ]
-    
-    created_count = 0
-    for prompt_data in default_prompts:
-        existing = db.query(Prompt).filter(
-            Prompt.name == prompt_data["name"],
-            Prompt.agent_id == agent_id
-        ).first()
-        
-        if not existing:
-            prompt = Prompt(
-                name=prompt_data["name"],
-                content=prompt_data["content"],
-                agent_id=agent_id
-            )
-            db.add(prompt)
-            created_count += 1
-    
-    db.commit()
-    print(f"✓ Created {created_count} default prompts")
+    created = _insert_missing(
+        db, Prompt, [{**prompt_data, "agent_id": agent_id} for prompt_data in DEFAULT_PROMPTS],
+        keys=["name", "agent_id"]
+    )
+    print(f"✓ Created {len(created)} default prompts")
 
 
 def seed_default_policy(db: Session, user_id: int):
     """Create default policy"""
-    policy = db.query(Policy).filter(Policy.name == "Default Policy", Policy.user_id == user_id).first()
-    if not policy:
-        policy = Policy(
-            name="Default Policy",
-            rules={
+    created = _insert_missing(db, Policy, [
+        {
+            "name": "Default Policy",
+            "rules": {
                 "auto_respond": False,
                 "require_approval": True,
                 "max_response_length": 500,
@@ -110,51 +144,22 @@ def seed_default_policy(db: Session, user_id: int):
                 "topics_to_avoid": ["sensitive", "confidential"],
                 "response_time_limit": 300,  # seconds
             },
-            user_id=user_id
-        )
-        db.add(policy)
-        db.commit()
-        db.refresh(policy)
-        print(f"✓ Created default policy: {policy.name}")
+            "user_id": user_id
+        },
+    ], keys=["name", "user_id"])
+    if created:
+        print(f"✓ Created default policy: {created[0].name}")
     else:
-        print(f"✓ Default policy exists: {policy.name}")
+        print("✓ Default policy exists: Default Policy")
 
 
 def seed_default_settings(db: Session, user_id: int):
     """Create default settings"""
-    default_settings = [
-        {
-            "key": "llm_provider",
-            "value": {"provider": "ollama"}
-        },
-        {
-            "key": "embedding_model",
-            "value": {"model": "sentence-transformers/all-MiniLM-L6-v2"}
-        },
-        {
-            "key": "auto_indexing",
-            "value": {"enabled": True}
-        },
-    ]
-    
-    created_count = 0
-    for setting_data in default_settings:
-        existing = db.query(Setting).filter(
-            Setting.key == setting_data["key"],
-            Setting.user_id == user_id
-        ).first()
-        
-        if not existing:
-            setting = Setting(
-                key=setting_data["key"],
-                value=setting_data["value"],
-                user_id=user_id
-            )
-            db.add(setting)
-            created_count += 1
-    
-    db.commit()
-    print(f"✓ Created {created_count} default settings")
+    created = _insert_missing(
+        db, Setting, [{**setting_data, "user_id": user_id} for setting_data in DEFAULT_SETTINGS],
+        keys=["key", "user_id"]
+    )
+    print(f"✓ Created {len(created)} default settings")
 
 
 def main():
@@ -164,11 +169,13 @@ def main():
     db = SessionLocal()
     try:
         # Seed in order
-        user = seed_default_user(db)
-        agent = seed_minimee_agent(db, user.id)
-        seed_default_prompts(db, agent.id)
-        seed_default_policy(db, user.id)
-        seed_default_settings(db, user.id)
+        user_id, agent_id = seed_default_user_and_agent(db)
+        seed_default_prompts(db, agent_id)
+        seed_default_policy(db, user_id)
+        seed_default_settings(db, user_id)
+        
+        # Single commit: the inserts return their ids, nothing needs to be committed earlier
+        db.commit()
         
         print("\n✅ Seed completed successfully!")
         